@@ -22,6 +22,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import argparse
+import concurrent.futures
 import contextlib
 import logging
 import os
@@ -40,6 +41,7 @@ import dnf.const
 import dnf.exceptions
 import dnf.util
 import dnf.logging
+import dnf.persistor
 import dnf.pycomp
 import libdnf.conf
 
@@ -276,8 +278,7 @@ class EmittersConfig(Config):
 
 def gpgsigcheck(base, pkgs):
     ok = True
-    for po in pkgs:
-        result, errmsg = base.package_signature_check(po)
+    for result, errmsg in base._sig_check_pkgs(pkgs):
         if result != 0:
             ok = False
             logger.critical(errmsg)
@@ -285,12 +286,55 @@ def gpgsigcheck(base, pkgs):
         raise dnf.exceptions.Error(_("GPG check FAILED"))
 
 
-def wait_for_network(repos, timeout):
+# addresses probed at the same time
+_PROBE_WORKERS = 16
+# seconds a remote address is remembered as reachable
+_REACHED_TTL = 7 * 24 * 60 * 60
+
+
+def _probe(address):
+    s = socket.create_connection(address, 1)
+    s.close()
+    return address
+
+
+def _probe_any(addresses, deadline):
+    """Return the first of addresses accepting a connection before deadline.
+
+    Returns None if none of them did. Addresses are probed in their order by
+    a bounded pool, so an unreachable one delays only its own worker.
+
+    """
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(len(addresses), _PROBE_WORKERS))
+    futures = [executor.submit(_probe, address) for address in addresses]
+    try:
+        pending = set(futures)
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, timeout=max(deadline - time.time(), 0),
+                return_when=concurrent.futures.FIRST_COMPLETED)
+            if not done:
+                return None
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+        return None
+    finally:
+        for future in futures:
+            future.cancel()
+        # the running probes finish within their connect timeout
+        executor.shutdown(wait=False)
+
+
+def wait_for_network(repos, timeout, cachedir=None):
     '''
     Wait up to <timeout> seconds for network connection to be available.
     if <timeout> is 0 the network availability detection will be skipped.
     Returns True if any remote repository is accessible or remote repositories are not enabled.
     Returns False if none of remote repositories is accessible.
+    All remote addresses are probed concurrently. If <cachedir> is given, the addresses
+    reached by previous runs are remembered there and probed first.
     '''
     if timeout <= 0:
         return True
@@ -327,17 +371,31 @@ def wait_for_network(repos, timeout):
         # there is no remote repository enabled so network connection should not be needed
         return True
 
+    persistor = dnf.persistor.ReachabilityPersistor(cachedir) if cachedir else None
+    now = time.time()
+    reached = {}
+    if persistor:
+        reached = {key: when for key, when in persistor.load().items()
+                   if isinstance(when, (int, float)) and now - when < _REACHED_TTL}
+
+    def address_key(address):
+        return '%s:%d' % address
+
+    # the recently reached addresses get the workers first
+    ordered = sorted(addresses, key=lambda a: (-reached.get(address_key(a), 0), a))
+
     logger.debug(_('Waiting for internet connection...'))
-    time_0 = time.time()
-    while time.time() - time_0 < timeout:
-        for host, port in addresses:
-            try:
-                s = socket.create_connection((host, port), 1)
-                s.close()
-                return True
-            except socket.error:
-                pass
-        time.sleep(1)
+    deadline = now + timeout
+    while time.time() < deadline:
+        round_start = time.time()
+        address = _probe_any(ordered, deadline)
+        if address is not None:
+            if persistor:
+                reached[address_key(address)] = time.time()
+                persistor.save(reached)
+            return True
+        # do not spin when the probes fail at once
+        time.sleep(max(min(round_start + 1, deadline) - time.time(), 0))
     return False
 
 
@@ -370,7 +428,8 @@ def main(args):
             base.pre_configure_plugins()
             base.read_all_repos()
 
-            if not wait_for_network(base.repos, conf.commands.network_online_timeout):
+            if not wait_for_network(base.repos, conf.commands.network_online_timeout,
+                                    base.conf.cachedir):
                 logger.warning(_('System is off-line.'))
 
             base.configure_plugins()
@@ -24,6 +24,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import argparse
+import concurrent.futures
 import dnf
 import libdnf.transaction
 
@@ -57,6 +58,7 @@ try:
 except ImportError:
     WITH_MODULES = False
 import dnf.persistor
+import dnf.pkgstore
 import dnf.plugin
 import dnf.query
 import dnf.repo
@@ -99,6 +101,8 @@ class Base(object):
         self._sack = None
         self._transaction = None
         self._priv_ts = None
+        # headers of the packages to install, read ahead of _populate_rpm_ts()
+        self._header_loader = dnf.rpm._HeaderLoader()
         self._comps = None
         self._comps_trans = dnf.comps.TransactionBunch()
         self._history = None
@@ -117,6 +121,9 @@ class Base(object):
         self._update_security_options = {}
         self._allow_erasing = False
         self._repo_set_imported_gpg_keys = set()
+        # reuse the excludes computed by a previous run, set by the CLI for
+        # read-only commands
+        self._use_sack_snapshot = False
         self._persistence = libdnf.transaction.TransactionPersistence_UNKNOWN
         self.output = None
 
@@ -139,6 +146,9 @@ class Base(object):
 
     def _add_repo_to_sack(self, repo):
         repo.load()
+        self._load_repo_to_sack(repo)
+
+    def _load_repo_to_sack(self, repo):
         mdload_flags = dict(load_presto=repo.deltarpm,
                             load_updateinfo=True)
         if 'filelists' in self.conf.optional_metadata_types:
@@ -152,6 +162,24 @@ class Base(object):
             raise dnf.exceptions.RepoError(
                 _("Loading repository '{}' has failed").format(repo.id))
 
+    def _load_repos_metadata(self, repos):
+        """Fetch and validate the metadata of the repos concurrently.
+
+        Only repo.load() runs in the worker threads, the repos still need to
+        be added to the sack one by one. Returns a dict mapping the repos
+        which failed to load to the raised RepoError.
+        """
+        errors = {}
+        workers = min(self.conf.max_parallel_repo_loads, len(repos))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [(repo, executor.submit(repo.load)) for repo in repos]
+            for repo, future in futures:
+                try:
+                    future.result()
+                except dnf.exceptions.RepoError as e:
+                    errors[repo] = e
+        return errors
+
     @staticmethod
     def _setup_default_conf():
         conf = dnf.conf.Conf()
@@ -185,60 +213,78 @@ class Base(object):
         if 'all' in disabled and WITH_MODULES:
             self._setup_modular_excludes()
             return
-        repo_includes = []
-        repo_excludes = []
+        excludes, includes = self._evaluate_excludes_includes(only_main)
+        self._apply_excludes_includes(excludes, includes)
+
+        if not only_main and WITH_MODULES:
+            self._setup_modular_excludes()
+
+    def _evaluate_excludes_includes(self, only_main=False):
+        """Evaluate the exclude and include patterns against the sack.
+
+        Return the list of exclude queries and the list of (include query,
+        repoid) pairs, with repoid None for the main includes.
+        """
+        disabled = set(self.conf.disable_excludes)
+        excludes = []
+        includes = []
         # first evaluate repo specific includes/excludes
         if not only_main:
             for r in self.repos.iter_enabled():
                 if r.id in disabled:
                     continue
                 if len(r.includepkgs) > 0:
-                    incl_query = self.sack.query().filterm(empty=True)
-                    for incl in set(r.includepkgs):
-                        subj = dnf.subject.Subject(incl)
-                        incl_query = incl_query.union(subj.get_best_query(
-                            self.sack, with_nevra=True, with_provides=False, with_filenames=False))
+                    incl_query = dnf.query._by_nevra_patterns(self.sack, r.includepkgs)
                     incl_query.filterm(reponame=r.id)
-                    repo_includes.append((incl_query.apply(), r.id))
-                excl_query = self.sack.query().filterm(empty=True)
-                for excl in set(r.excludepkgs):
-                    subj = dnf.subject.Subject(excl)
-                    excl_query = excl_query.union(subj.get_best_query(
-                        self.sack, with_nevra=True, with_provides=False, with_filenames=False))
+                    includes.append((incl_query.apply(), r.id))
+                excl_query = dnf.query._by_nevra_patterns(self.sack, r.excludepkgs)
                 excl_query.filterm(reponame=r.id)
                 if excl_query:
-                    repo_excludes.append((excl_query, r.id))
+                    excludes.append(excl_query)
 
         # then main (global) includes/excludes because they can mask
         # repo specific settings
         if 'main' not in disabled:
-            include_query = self.sack.query().filterm(empty=True)
+            exclude_query = dnf.query._by_nevra_patterns(self.sack, self.conf.excludepkgs)
             if len(self.conf.includepkgs) > 0:
-                for incl in set(self.conf.includepkgs):
-                    subj = dnf.subject.Subject(incl)
-                    include_query = include_query.union(subj.get_best_query(
-                        self.sack, with_nevra=True, with_provides=False, with_filenames=False))
-            exclude_query = self.sack.query().filterm(empty=True)
-            for excl in set(self.conf.excludepkgs):
-                subj = dnf.subject.Subject(excl)
-                exclude_query = exclude_query.union(subj.get_best_query(
-                    self.sack, with_nevra=True, with_provides=False, with_filenames=False))
-            if len(self.conf.includepkgs) > 0:
-                self.sack.add_includes(include_query)
-                self.sack.set_use_includes(True)
+                include_query = dnf.query._by_nevra_patterns(self.sack, self.conf.includepkgs)
+                includes.insert(0, (include_query, None))
             if exclude_query:
-                self.sack.add_excludes(exclude_query)
+                excludes.insert(0, exclude_query)
+        return excludes, includes
 
-        if repo_includes:
-            for query, repoid in repo_includes:
-                self.sack.add_includes(query)
+    def _apply_excludes_includes(self, excludes, includes):
+        for query, repoid in includes:
+            self.sack.add_includes(query)
+            if repoid is None:
+                self.sack.set_use_includes(True)
+            else:
                 self.sack.set_use_includes(True, repoid)
+        for query in excludes:
+            self.sack.add_excludes(query)
 
-        if repo_excludes:
-            for query, repoid in repo_excludes:
-                self.sack.add_excludes(query)
+    def _setup_excludes_includes_from_snapshot(self, load_system_repo):
+        """Set up the excludes and includes using the sack snapshot if it is up to date.
 
-        if not only_main and WITH_MODULES:
+        Otherwise evaluate them as usual and store the snapshot for the next run. The
+        modular filtering is not part of the snapshot, it is always set up again.
+        """
+        if 'all' in self.conf.disable_excludes:
+            self._setup_excludes_includes()
+            return
+        persistor = dnf.persistor.SackSnapshotPersistor(self.conf.cachedir)
+        key = dnf.sack._snapshot_key(self, load_system_repo)
+        snapshot = persistor.load(key) if key is not None else None
+        if snapshot is not None:
+            logger.debug(_("Using sack snapshot %s."), key)
+            excludes, includes = dnf.sack._snapshot_queries(self.sack, snapshot)
+        else:
+            excludes, includes = self._evaluate_excludes_includes()
+            if key is not None:
+                persistor.save(key, dnf.sack._excludes_snapshot(excludes, includes))
+        self._apply_excludes_includes(excludes, includes)
+
+        if WITH_MODULES:
             self._setup_modular_excludes()
 
     def _store_persistent_data(self):
@@ -408,9 +454,18 @@ class Base(object):
                 # Iterate over installed GPG keys and check their validity using DNSSEC
                 if self.conf.gpgkey_dns_verification:
                     dnf.dnssec.RpmImportedKeys.check_imported_keys_validity()
-                for r in self.repos.iter_enabled():
+                repos = list(self.repos.iter_enabled())
+                preloaded = len(repos) > 1 and self.conf.max_parallel_repo_loads > 1
+                if preloaded:
+                    load_errors = self._load_repos_metadata(repos)
+                for r in repos:
                     try:
-                        self._add_repo_to_sack(r)
+                        if not preloaded:
+                            self._add_repo_to_sack(r)
+                        elif r in load_errors:
+                            raise load_errors[r]
+                        else:
+                            self._load_repo_to_sack(r)
                         if r._repo.getTimestamp() > mts:
                             mts = r._repo.getTimestamp()
                         if r._repo.getAge() < age:
@@ -437,7 +492,10 @@ class Base(object):
                 self.repos.all().disable()
         conf = self.conf
         self._sack._configure(conf.installonlypkgs, conf.installonly_limit, conf.allow_vendor_change)
-        self._setup_excludes_includes()
+        if self._use_sack_snapshot and conf.sack_snapshot:
+            self._setup_excludes_includes_from_snapshot(load_system_repo is not False)
+        else:
+            self._setup_excludes_includes()
         timer()
         self._goal = dnf.goal.Goal(self._sack)
         self._goal.protect_running_kernel = conf.protect_running_kernel
@@ -550,6 +608,8 @@ class Base(object):
         self._closed = True
         self._finalize_base()
         self.reset(sack=True, repos=True, goal=True)
+        if self._plugins is not None:
+            self._plugins._report_hook_times()
         self._plugins = None
 
     def read_all_repos(self, opts=None):
@@ -582,6 +642,7 @@ class Base(object):
                 self.history.close()
             self._comps_trans = dnf.comps.TransactionBunch()
             self._transaction = None
+            self._header_loader.close()
         self._update_security_filters = []
         if sack and goal:
             # We've just done this, above:
@@ -695,6 +756,7 @@ class Base(object):
         self._comps = dnf.comps.Comps()
 
         logger.log(dnf.logging.DDEBUG, 'Getting group metadata')
+        comps_files = []
         for repo in self.repos.iter_enabled():
             if not repo.enablegroups:
                 continue
@@ -703,7 +765,22 @@ class Base(object):
             comps_fn = repo._repo.getCompsFn()
             if not comps_fn:
                 continue
+            comps_files.append((repo, comps_fn))
+
+        # the merged comps of the same comps files are read from one file
+        persistor = dnf.persistor.CompsCachePersistor(self.conf.cachedir)
+        key = dnf.comps._cache_key([(repo.id, comps_fn) for repo, comps_fn in comps_files])
+        cache_file = persistor.load(key) if key and comps_files else None
+        if cache_file:
+            try:
+                self._comps._add_from_xml_filename(cache_file)
+            except dnf.exceptions.CompsError as e:
+                logger.debug('Failed to read comps cache: %s', e)
+                self._comps = dnf.comps.Comps()
+                cache_file = None
 
+        failed = False
+        for repo, comps_fn in comps_files if not cache_file else ():
             logger.log(dnf.logging.DDEBUG,
                        'Adding group file from repository: %s', repo.id)
             gen_dir = os.path.join(os.path.dirname(comps_fn), 'gen')
@@ -722,8 +799,11 @@ class Base(object):
             except dnf.exceptions.CompsError as e:
                 msg = _('Failed to add groups file for repository: %s - %s')
                 logger.critical(msg, repo.id, e)
+                failed = True
             if temp_file:
                 temp_file.close()
+        if key and comps_files and not cache_file and not failed:
+            persistor.save(key, self._comps)
 
         if arch_filter:
             self._comps._i.arch_filter(
@@ -751,6 +831,40 @@ class Base(object):
         installonly_query = self._get_installonly_query()
         installonly_query.apply()
         installonly_query_installed = installonly_query.installed().apply()
+        installonly_installed_names = {pkg.name for pkg in installonly_query_installed}
+
+        installs = []
+        for pkg in goal.list_installs():
+            obs = goal.obsoleted_by_package(pkg)
+            # Skip obsoleted packages that are not part of all_obsoleted,
+            # they are handled as upgrades/downgrades.
+            # Also keep RPMs with the same name - they're not always in all_obsoleted.
+            obs = [i for i in obs if i in all_obsoleted or i.name == pkg.name]
+            #  Inherit reason if package is installonly an package with same name is installed
+            #  Use the same logic like upgrade
+            #  Upgrade of installonly packages result in install or install and remove step
+            inherit = pkg.name in installonly_installed_names and pkg in installonly_query
+            installs.append((pkg, obs, inherit))
+
+        erasures = goal.list_erasures()
+        remaining_installed = {}
+        if erasures:
+            remaining_installed_query = self.sack.query(flags=hawkey.IGNORE_EXCLUDES).installed()
+            remaining_installed_query.filterm(pkg__neq=erasures)
+            erased_na = {(pkg.name, pkg.arch) for pkg in erasures}
+            for pkg in remaining_installed_query:
+                na = (pkg.name, pkg.arch)
+                if na in erased_na:
+                    remaining_installed.setdefault(na, pkg)
+
+        # the reasons of all the packages the transaction inherits them from,
+        # read from the history at once
+        inherit_from = list(remaining_installed.values())
+        for pkg, obs, inherit in installs:
+            if inherit:
+                inherit_from.append(pkg)
+            inherit_from.extend(obs)
+        reasons = self.history.reasons(inherit_from)
 
         for pkg in goal.list_downgrades():
             obs = goal.obsoleted_by_package(pkg)
@@ -772,25 +886,16 @@ class Base(object):
                     obsoletes.append(obs_pkg)
             reinstalled = obsoletes[0]
             ts.add_reinstall(pkg, reinstalled, obsoletes[1:])
-        for pkg in goal.list_installs():
+        for pkg, obs, inherit in installs:
             self._ds_callback.pkg_added(pkg, 'i')
-            obs = goal.obsoleted_by_package(pkg)
-            # Skip obsoleted packages that are not part of all_obsoleted,
-            # they are handled as upgrades/downgrades.
-            # Also keep RPMs with the same name - they're not always in all_obsoleted.
-            obs = [i for i in obs if i in all_obsoleted or i.name == pkg.name]
 
             reason = goal.get_reason(pkg)
-
-            #  Inherit reason if package is installonly an package with same name is installed
-            #  Use the same logic like upgrade
-            #  Upgrade of installonly packages result in install or install and remove step
-            if pkg in installonly_query and installonly_query_installed.filter(name=pkg.name):
-                reason = ts.get_reason(pkg)
+            if inherit:
+                reason = reasons[pkg]
 
             # inherit the best reason from obsoleted packages
             for obsolete in obs:
-                reason_obsolete = ts.get_reason(obsolete)
+                reason_obsolete = reasons[obsolete]
                 if libdnf.transaction.TransactionItemReasonCompare(reason, reason_obsolete) == -1:
                     reason = reason_obsolete
 
@@ -823,20 +928,13 @@ class Base(object):
                 ts.add_upgrade(pkg, upgraded, obs)
                 self._ds_callback.pkg_added(upgraded, 'ud')
             self._ds_callback.pkg_added(pkg, 'u')
-        erasures = goal.list_erasures()
-        if erasures:
-            remaining_installed_query = self.sack.query(flags=hawkey.IGNORE_EXCLUDES).installed()
-            remaining_installed_query.filterm(pkg__neq=erasures)
-            remaining_installed_query.apply()
-            for pkg in erasures:
-                tmp_remaining_installed_query = remaining_installed_query.filter(name=pkg.name, arch=pkg.arch)
-                if tmp_remaining_installed_query:
-                    remaining = tmp_remaining_installed_query[0]
-                    ts.get_reason(remaining)
-                    self.history.set_reason(remaining, ts.get_reason(remaining))
-                self._ds_callback.pkg_added(pkg, 'e')
-                reason = goal.get_reason(pkg)
-                ts.add_erase(pkg, reason)
+        for pkg in erasures:
+            remaining = remaining_installed.get((pkg.name, pkg.arch))
+            if remaining is not None:
+                self.history.set_reason(remaining, reasons[remaining])
+            self._ds_callback.pkg_added(pkg, 'e')
+            reason = goal.get_reason(pkg)
+            ts.add_erase(pkg, reason)
         return ts
 
     def _query_matches_installed(self, q):
@@ -868,8 +966,7 @@ class Base(object):
 
     def iter_userinstalled(self):
         """Get iterator over the packages installed by the user."""
-        return (pkg for pkg in self.sack.query().installed()
-                if self.history.user_installed(pkg))
+        return iter(self.history.filter_user_installed(self.sack.query().installed()))
 
     def _run_hawkey_goal(self, goal, allow_erasing):
         ret = goal.run(
@@ -988,7 +1085,11 @@ class Base(object):
         lock = dnf.lock.build_rpmdb_lock(self.conf.persistdir,
                                          self.conf.exit_on_lock)
         with lock:
-            self.transaction._populate_rpm_ts(self._ts)
+            self._prefetch_headers()
+            try:
+                self.transaction._populate_rpm_ts(self._ts, self._header_loader)
+            finally:
+                self._header_loader.close()
 
             msgs = self._run_rpm_check()
             if msgs:
@@ -1236,6 +1337,7 @@ class Base(object):
         self._trans_success = True
 
     def _download_remote_payloads(self, payloads, drpm, progress, callback_total, fail_fast=True):
+        """Download the payloads, return the packages which failed recoverably."""
         lock = dnf.lock.build_download_lock(self.conf.cachedir, self.conf.exit_on_lock)
         with lock:
             beg_download = time.time()
@@ -1301,6 +1403,7 @@ class Base(object):
                         "(%.1f%% wasted)")
                 percent = real / full * 100 - 100
             logger.info(msg, full / 1024 ** 2, real / 1024 ** 2, percent)
+        return errors._recoverable
 
     def download_packages(self, pkglist, progress=None, callback_total=None):
         # :api
@@ -1312,6 +1415,7 @@ class Base(object):
 
         """
         remote_pkgs, local_pkgs = self._select_remote_pkgs(pkglist)
+        self._prefetch_headers(local_pkgs)
         if remote_pkgs:
             if progress is None:
                 progress = dnf.callback.NullDownloadProgress()
@@ -1321,7 +1425,15 @@ class Base(object):
             payloads = [dnf.repo._pkg2payload(pkg, progress, drpm.delta_factory,
                                               dnf.repo.RPMPayload)
                         for pkg in remote_pkgs]
-            self._download_remote_payloads(payloads, drpm, progress, callback_total)
+            failed = self._download_remote_payloads(payloads, drpm, progress, callback_total)
+            store = self._package_store()
+            if store is not None:
+                # the download verified the checksums of the other packages
+                for pkg in remote_pkgs:
+                    if pkg not in failed:
+                        store.add(pkg)
+                store.evict()
+            self._prefetch_headers(remote_pkgs)
 
         if self.conf.destdir:
             for pkg in remote_pkgs:
@@ -1340,6 +1452,20 @@ class Base(object):
                 except shutil.SameFileError:
                     pass
 
+    def _prefetch_headers(self, pkgs=None):
+        """Start reading the headers of the pkgs to be installed in the background.
+
+        All the packages to be installed by the transaction if pkgs is None.
+
+        """
+        if self._transaction is None:
+            return
+        install_set = self._transaction.install_set
+        if pkgs is not None:
+            install_set = [pkg for pkg in pkgs if pkg in install_set]
+        self._header_loader.prefetch(
+            [pkg.localPkg() for pkg in install_set if os.path.exists(pkg.localPkg())])
+
     def add_remote_rpms(self, path_list, strict=True, progress=None):
         # :api
         pkgs = []
@@ -1376,49 +1502,72 @@ class Base(object):
                     might help.
               2 = Fatal GPG verification error, give up.
         """
-        if po._from_cmdline:
-            check = self.conf.localpkg_gpgcheck
-            hasgpgkey = 0
-        else:
-            repo = self.repos[po.repoid]
-            check = repo.gpgcheck
-            hasgpgkey = not not repo.gpgkey
-
-        if check:
-            root = self.conf.installroot
-            ts = dnf.rpm.transaction.initReadOnlyTransaction(root)
-            sigresult = dnf.rpm.miscutils.checkSig(ts, po.localPkg())
-            localfn = os.path.basename(po.localPkg())
+        return self._sig_check_pkgs([po])[0]
+
+    def _sig_check_pkgs(self, pkgs):
+        """Verify the GPG signatures of the given package objects, see
+        _sig_check_pkg().
+
+        The signatures are checked concurrently with one transaction set,
+        the results are returned in the order of pkgs.
+        """
+        pkgs = list(pkgs)
+        checked = []
+        hasgpgkeys = []
+        for po in pkgs:
+            if po._from_cmdline:
+                check = self.conf.localpkg_gpgcheck
+                hasgpgkey = 0
+            else:
+                repo = self.repos[po.repoid]
+                check = repo.gpgcheck
+                hasgpgkey = not not repo.gpgkey
+            checked.append(check)
+            hasgpgkeys.append(hasgpgkey)
+
+        sigresults = iter([])
+        if any(checked):
+            ts = dnf.rpm.transaction.initReadOnlyTransaction(self.conf.installroot)
+            sigresults = iter(dnf.rpm.miscutils.checkSigs(
+                ts, [po.localPkg() for po, check in zip(pkgs, checked) if check]))
             del ts
-            if sigresult == 0:
-                result = 0
-                msg = ''
 
-            elif sigresult == 1:
-                if hasgpgkey:
-                    result = 1
-                else:
-                    result = 2
-                msg = _('Public key for %s is not installed') % localfn
+        results = []
+        for po, check, hasgpgkey in zip(pkgs, checked, hasgpgkeys):
+            if check:
+                results.append(self._sig_check_result(po, next(sigresults), hasgpgkey))
+            else:
+                results.append((0, ''))
+        return results
 
-            elif sigresult == 2:
+    @staticmethod
+    def _sig_check_result(po, sigresult, hasgpgkey):
+        localfn = os.path.basename(po.localPkg())
+        if sigresult == 0:
+            result = 0
+            msg = ''
+
+        elif sigresult == 1:
+            if hasgpgkey:
+                result = 1
+            else:
                 result = 2
-                msg = _('Problem opening package %s') % localfn
+            msg = _('Public key for %s is not installed') % localfn
 
-            elif sigresult == 3:
-                if hasgpgkey:
-                    result = 1
-                else:
-                    result = 2
-                msg = _('Public key for %s is not trusted') % localfn
+        elif sigresult == 2:
+            result = 2
+            msg = _('Problem opening package %s') % localfn
 
-            elif sigresult == 4:
+        elif sigresult == 3:
+            if hasgpgkey:
+                result = 1
+            else:
                 result = 2
-                msg = _('Package %s is not signed') % localfn
+            msg = _('Public key for %s is not trusted') % localfn
 
-        else:
-            result = 0
-            msg = ''
+        elif sigresult == 4:
+            result = 2
+            msg = _('Package %s is not signed') % localfn
 
         return result, msg
 
@@ -1493,15 +1642,12 @@ class Base(object):
 
     def _list_pattern(self, pkgnarrow, pattern, showdups, ignore_case,
                       reponame=None):
-        def is_from_repo(package):
-            """Test whether given package originates from the repository."""
-            if reponame is None:
-                return True
-            return self.history.repo(package) == reponame
-
         def pkgs_from_repo(packages):
             """Filter out the packages which do not originate from the repo."""
-            return (package for package in packages if is_from_repo(package))
+            if reponame is None:
+                return list(packages)
+            repos = self.history.repos(packages)
+            return [package for package, repo in repos.items() if repo == reponame]
 
         def query_for_repo(query):
             """Filter out the packages which do not originate from the repo."""
@@ -1540,7 +1686,7 @@ class Base(object):
                 key = (po.name, po.arch)
                 if key not in ndinst or po > ndinst[key]:
                     ndinst[key] = po
-            installed = list(pkgs_from_repo(dinst.values()))
+            installed = pkgs_from_repo(dinst.values())
 
             avail = query_for_repo(q.available())
             if not showdups:
@@ -1572,7 +1718,7 @@ class Base(object):
 
         # installed only
         elif pkgnarrow == 'installed':
-            installed = list(pkgs_from_repo(q.installed()))
+            installed = pkgs_from_repo(q.installed())
 
         # available in a repository
         elif pkgnarrow == 'available':
@@ -1610,7 +1756,7 @@ class Base(object):
 
         # not in a repo but installed
         elif pkgnarrow == 'extras':
-            extras = [pkg for pkg in q.extras() if is_from_repo(pkg)]
+            extras = pkgs_from_repo(q.extras())
 
         # obsoleting packages (and what they obsolete)
         elif pkgnarrow == 'obsoletes':
@@ -2729,6 +2875,12 @@ class Base(object):
                 pkg_spec != solution['query'][0].name:
             logger.info(_("  * Maybe you meant: {}").format(solution['query'][0].name))
 
+    def _package_store(self):
+        if not self.conf.pkgstore:
+            return None
+        return dnf.pkgstore.PackageStore(self.conf.pkgstore,
+                                         self.conf.pkgstore_max_size * 1024 * 1024)
+
     def _select_remote_pkgs(self, install_pkgs):
         """ Check checksum of packages from local repositories and returns list packages from remote
         repositories that will be downloaded. Packages from commandline are skipped.
@@ -2759,6 +2911,14 @@ class Base(object):
             else:
                 remote_pkgs.append(pkg)
 
+        store = self._package_store()
+        if store is not None:
+            # the download finds them complete and skips them
+            found = [pkg for pkg in remote_pkgs if store.fetch(pkg)]
+            if found:
+                logger.debug(_('Using %d packages from the package store %s'),
+                             len(found), store.root)
+
         msg = _('Package "{}" from local repository "{}" has incorrect checksum')
         if not _verification_of_packages(local_repository_pkgs, msg):
             raise dnf.exceptions.Error(
@@ -31,6 +31,7 @@ except ImportError:
 from collections import defaultdict
 import datetime
 from fnmatch import fnmatch
+import importlib
 import logging
 import operator
 import os
@@ -48,29 +49,6 @@ from dnf.i18n import ucd, _
 import dnf
 import dnf.cli.aliases
 import dnf.cli.commands
-import dnf.cli.commands.alias
-import dnf.cli.commands.autoremove
-import dnf.cli.commands.check
-import dnf.cli.commands.clean
-import dnf.cli.commands.deplist
-import dnf.cli.commands.distrosync
-import dnf.cli.commands.downgrade
-import dnf.cli.commands.group
-import dnf.cli.commands.history
-import dnf.cli.commands.install
-import dnf.cli.commands.makecache
-import dnf.cli.commands.mark
-import dnf.cli.commands.module
-import dnf.cli.commands.reinstall
-import dnf.cli.commands.remove
-import dnf.cli.commands.repolist
-import dnf.cli.commands.repoquery
-import dnf.cli.commands.search
-import dnf.cli.commands.shell
-import dnf.cli.commands.swap
-import dnf.cli.commands.updateinfo
-import dnf.cli.commands.upgrade
-import dnf.cli.commands.upgrademinimal
 import dnf.cli.demand
 import dnf.cli.format
 import dnf.cli.option_parser
@@ -337,8 +315,13 @@ class BaseCli(dnf.Base):
         """
         error_messages = []
         print_plugin_recommendation = False
-        for po in pkgs:
-            result, errmsg = self._sig_check_pkg(po)
+        key_imported = False
+        pkgs = list(pkgs)
+        # check all signatures at once, keys are imported one by one below
+        for po, (result, errmsg) in zip(pkgs, self._sig_check_pkgs(pkgs)):
+            if result == 1 and key_imported:
+                # a key imported for an earlier package may be the right one
+                result, errmsg = self._sig_check_pkg(po)
 
             if result == 0:
                 # Verified ok, or verify not req'd
@@ -355,6 +338,7 @@ class BaseCli(dnf.Base):
                 fn = lambda x, y, z: self.output.userconfirm()
                 try:
                     self._get_key_for_package(po, fn)
+                    key_imported = True
                 except (dnf.exceptions.Error, ValueError) as e:
                     error_messages.append(str(e))
                     if isinstance(e, dnf.exceptions.InvalidInstalledGPGKeyError):
@@ -682,36 +666,152 @@ class BaseCli(dnf.Base):
         return True
 
 
+# Built-in commands living in their own dnf.cli.commands.* module. The module is
+# imported only once the command is looked up, so that a run needs to import just
+# the command it dispatches. The declared aliases route the lookups and let a
+# command registered by a plugin be checked for a clash without the import. Once
+# imported, the command is registered under the aliases of its class.
+_BUILTIN_COMMANDS = (
+    ('alias', 'AliasCommand', ('alias',)),
+    ('autoremove', 'AutoremoveCommand',
+     ('autoremove', 'autoremove-n', 'autoremove-na', 'autoremove-nevra')),
+    ('check', 'CheckCommand', ('check',)),
+    ('clean', 'CleanCommand', ('clean',)),
+    ('distrosync', 'DistroSyncCommand',
+     ('distro-sync', 'distrosync', 'distribution-synchronization', 'dsync')),
+    ('deplist', 'DeplistCommand', ('deplist',)),
+    ('downgrade', 'DowngradeCommand', ('downgrade', 'dg')),
+    ('group', 'GroupCommand',
+     ('group', 'groups', 'grp', 'grouplist', 'groupinstall', 'groupupdate', 'groupremove',
+      'grouperase', 'groupinfo')),
+    ('history', 'HistoryCommand', ('history', 'hist')),
+    ('install', 'InstallCommand',
+     ('install', 'localinstall', 'in', 'install-n', 'install-na', 'install-nevra')),
+    ('makecache', 'MakeCacheCommand', ('makecache', 'mc')),
+    ('mark', 'MarkCommand', ('mark',)),
+    ('module', 'ModuleCommand', ('module',)),
+    ('reinstall', 'ReinstallCommand', ('reinstall', 'rei')),
+    ('remove', 'RemoveCommand',
+     ('remove', 'erase', 'rm', 'remove-n', 'remove-na', 'remove-nevra', 'erase-n', 'erase-na',
+      'erase-nevra')),
+    ('repolist', 'RepoListCommand', ('repolist', 'repoinfo')),
+    ('repoquery', 'RepoQueryCommand',
+     ('repoquery', 'rq', 'repoquery-n', 'repoquery-na', 'repoquery-nevra')),
+    ('search', 'SearchCommand', ('search', 'se')),
+    ('shell', 'ShellCommand', ('shell', 'sh')),
+    ('swap', 'SwapCommand', ('swap',)),
+    ('updateinfo', 'UpdateInfoCommand',
+     ('updateinfo', 'upif', 'list-updateinfo', 'list-security', 'list-sec', 'info-updateinfo',
+      'info-security', 'info-sec', 'summary-updateinfo')),
+    ('upgrade', 'UpgradeCommand',
+     ('upgrade', 'update', 'upgrade-to', 'update-to', 'localupdate', 'up')),
+    ('upgrademinimal', 'UpgradeMinimalCommand', ('upgrade-minimal', 'update-minimal', 'up-min')),
+)
+
+
+class _LazyCommand(object):
+    """Placeholder for a built-in command whose module was not imported yet."""
+
+    def __init__(self, module, cls_name, aliases=()):
+        self.module = module
+        self.cls_name = cls_name
+        self.aliases = aliases
+        self.command_cls = None
+
+    def load(self):
+        if self.command_cls is None:
+            module = importlib.import_module('dnf.cli.commands.%s' % self.module)
+            self.command_cls = getattr(module, self.cls_name)
+        return self.command_cls
+
+
+class _CommandRegistry(dict):
+    """Alias -> command class mapping resolving lazy commands on lookup.
+
+    A lazy command is resolved when a name is looked up that is not registered
+    yet: first the command declaring the name or whose module matches it, then
+    the remaining ones in order until the name is found. Iterating the registry
+    resolves all of them. values() returns the unresolved entries, so that
+    listing the commands does not import them.
+    """
+
+    def __init__(self):
+        super(_CommandRegistry, self).__init__()
+        self._lazy = []
+
+    def __contains__(self, name):
+        return self._find(name)
+
+    def __getitem__(self, name):
+        self._find(name)
+        return dict.__getitem__(self, name)
+
+    def __iter__(self):
+        self._resolve_all()
+        return dict.__iter__(self)
+
+    def get(self, name, default=None):
+        if self._find(name):
+            return dict.__getitem__(self, name)
+        return default
+
+    def keys(self):
+        self._resolve_all()
+        return dict.keys(self)
+
+    def items(self):
+        self._resolve_all()
+        return dict.items(self)
+
+    def values(self):
+        return list(dict.values(self)) + self._lazy
+
+    def clear(self):
+        dict.clear(self)
+        self._lazy = []
+
+    def add(self, command_cls):
+        for name in command_cls.aliases:
+            if dict.__contains__(self, name) or any(name in lazy.aliases for lazy in self._lazy):
+                raise dnf.exceptions.ConfigError(_('Command "%s" already defined') % name)
+            dict.__setitem__(self, name, command_cls)
+
+    def add_lazy(self, lazy):
+        self._lazy.append(lazy)
+
+    def _find(self, name):
+        if dict.__contains__(self, name):
+            return True
+        if not isinstance(name, str):
+            return False
+        module = name.replace('-', '')
+        for lazy in self._lazy:
+            if name in lazy.aliases or lazy.module == module:
+                self._resolve(lazy)
+                break
+        while self._lazy and not dict.__contains__(self, name):
+            self._resolve(self._lazy[0])
+        return dict.__contains__(self, name)
+
+    def _resolve(self, lazy):
+        self._lazy.remove(lazy)
+        self.add(lazy.load())
+
+    def _resolve_all(self):
+        while self._lazy:
+            self._resolve(self._lazy[0])
+
+
 class Cli(object):
     def __init__(self, base):
         self.base = base
-        self.cli_commands = {}
+        self.cli_commands = _CommandRegistry()
         self.command = None
+        self._requested_command = None
         self.demands = dnf.cli.demand.DemandSheet()  # :api
 
-        self.register_command(dnf.cli.commands.alias.AliasCommand)
-        self.register_command(dnf.cli.commands.autoremove.AutoremoveCommand)
-        self.register_command(dnf.cli.commands.check.CheckCommand)
-        self.register_command(dnf.cli.commands.clean.CleanCommand)
-        self.register_command(dnf.cli.commands.distrosync.DistroSyncCommand)
-        self.register_command(dnf.cli.commands.deplist.DeplistCommand)
-        self.register_command(dnf.cli.commands.downgrade.DowngradeCommand)
-        self.register_command(dnf.cli.commands.group.GroupCommand)
-        self.register_command(dnf.cli.commands.history.HistoryCommand)
-        self.register_command(dnf.cli.commands.install.InstallCommand)
-        self.register_command(dnf.cli.commands.makecache.MakeCacheCommand)
-        self.register_command(dnf.cli.commands.mark.MarkCommand)
-        self.register_command(dnf.cli.commands.module.ModuleCommand)
-        self.register_command(dnf.cli.commands.reinstall.ReinstallCommand)
-        self.register_command(dnf.cli.commands.remove.RemoveCommand)
-        self.register_command(dnf.cli.commands.repolist.RepoListCommand)
-        self.register_command(dnf.cli.commands.repoquery.RepoQueryCommand)
-        self.register_command(dnf.cli.commands.search.SearchCommand)
-        self.register_command(dnf.cli.commands.shell.ShellCommand)
-        self.register_command(dnf.cli.commands.swap.SwapCommand)
-        self.register_command(dnf.cli.commands.updateinfo.UpdateInfoCommand)
-        self.register_command(dnf.cli.commands.upgrade.UpgradeCommand)
-        self.register_command(dnf.cli.commands.upgrademinimal.UpgradeMinimalCommand)
+        for module, cls_name, aliases in _BUILTIN_COMMANDS:
+            self.cli_commands.add_lazy(_LazyCommand(module, cls_name, aliases))
         self.register_command(dnf.cli.commands.InfoCommand)
         self.register_command(dnf.cli.commands.ListCommand)
         self.register_command(dnf.cli.commands.ProvidesCommand)
@@ -808,6 +908,7 @@ class Cli(object):
                     repo._repo.setSyncStrategy(dnf.repo.SYNC_LAZY)
 
         if demands.sack_activation:
+            self.base._use_sack_snapshot = demands.sack_snapshot
             self.base.fill_sack(
                 load_system_repo='auto' if self.demands.load_system_repo else False,
                 load_available_repos=self.demands.available_repos)
@@ -898,7 +999,9 @@ class Cli(object):
 
         # store the main commands & summaries, before plugins are loaded
         self.optparser.add_commands(self.cli_commands, 'main')
-        # store the plugin commands & summaries
+        # store the plugin commands & summaries, plugins declaring their
+        # commands are initialized only when one of them is requested
+        self._requested_command = opts.command
         self.base.init_plugins(opts.disableplugin, opts.enableplugin, self)
         self.optparser.add_commands(self.cli_commands,'plugin')
 
@@ -1107,10 +1210,7 @@ class Cli(object):
 
     def register_command(self, command_cls):
         """Register a Command. :api"""
-        for name in command_cls.aliases:
-            if name in self.cli_commands:
-                raise dnf.exceptions.ConfigError(_('Command "%s" already defined') % name)
-            self.cli_commands[name] = command_cls
+        self.cli_commands.add(command_cls)
 
     def run(self):
         """Call the base command, and pass it the extended commands or
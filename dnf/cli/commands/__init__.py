@@ -30,6 +30,7 @@ import dnf.cli
 import dnf.exceptions
 import dnf.pycomp
 import dnf.util
+import importlib
 import logging
 import os
 
@@ -54,6 +55,19 @@ will install it for you.
 For more information contact your distribution or package provider.""")
 
 
+def __getattr__(name):
+    """Import a command submodule on first access, so that code relying on
+    e.g. dnf.cli.commands.install keeps working without importing it."""
+    if not name.startswith('_'):
+        fullname = '%s.%s' % (__name__, name)
+        try:
+            return importlib.import_module(fullname)
+        except ImportError as e:
+            if getattr(e, 'name', None) != fullname:
+                raise
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
 def _checkGPGKey(base, cli):
     """Verify that there are gpg keys for the enabled repositories in the
     rpm database.
@@ -194,6 +208,7 @@ class InfoCommand(Command):
     def configure(self):
         demands = self.cli.demands
         demands.sack_activation = True
+        demands.sack_snapshot = True
         if self.opts._packages_action:
             self.opts.packages_action = self.opts._packages_action
         if self.opts.packages_action != 'installed':
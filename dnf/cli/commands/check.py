@@ -72,42 +72,38 @@ class CheckCommand(commands.Command):
     def run(self):
         output_set = set()
         q = self.base.sack.query().installed()
+        index = _InstalledIndex(q, self.base.sack.evr_cmp)
 
         if self.opts.check_types.intersection({'all', 'dependencies'}):
-            sack = None
+            missing = {}
             for pkg in q:
                 for require in set(pkg.regular_requires) | set(set(pkg.requires_pre) - set(pkg.prereq_ignoreinst)):
                     if str(require).startswith('rpmlib'):
                         continue
-                    if not len(q.filter(provides=[require])):
-                        if str(require).startswith('('):
-                            # rich deps can be only tested by solver
-                            if sack is None:
-                                sack = dnf.sack.rpmdb_sack(self.base)
-                            selector = dnf.selector.Selector(sack)
-                            selector.set(provides=str(require))
-                            goal = dnf.goal.Goal(sack)
-                            goal.protect_running_kernel = self.base.conf.protect_running_kernel
-                            goal.install(select=selector, optional=False)
-                            solved = goal.run()
-                            # there ase only @system repo in sack, therefore solved is only in case
-                            # when rich deps doesn't require any additional package
-                            if solved:
-                                continue
-                        msg = _("{} has missing requires of {}")
-                        output_set.add(msg.format(
-                            self.base.output.term.bold(pkg),
-                            self.base.output.term.bold(require)))
+                    if not index.satisfied(require):
+                        missing.setdefault(str(require), []).append((pkg, require))
                 for conflict in pkg.conflicts:
-                    conflicted = q.filter(provides=[conflict],
-                                          name=str(conflict).split()[0])
-                    for conflict_pkg in conflicted:
+                    for conflict_pkg in index.named_providers(conflict):
                         msg = '{} has installed conflict "{}": {}'
                         output_set.add(msg.format(
                             self.base.output.term.bold(pkg),
                             self.base.output.term.bold(conflict),
                             self.base.output.term.bold(conflict_pkg)))
 
+            # rich deps can be only tested by solver
+            rich = [dep for dep in missing if dep.startswith('(')]
+            if rich:
+                unsatisfied = self._unsatisfied_rich_deps(rich)
+                for dep in rich:
+                    if dep not in unsatisfied:
+                        del missing[dep]
+            for dep_pkgs in missing.values():
+                for pkg, require in dep_pkgs:
+                    msg = _("{} has missing requires of {}")
+                    output_set.add(msg.format(
+                        self.base.output.term.bold(pkg),
+                        self.base.output.term.bold(require)))
+
         if self.opts.check_types.intersection({'all', 'duplicates'}):
             installonly = self.base._get_installonly_query(q)
             dups = q.duplicated().difference(installonly)._name_dict()
@@ -122,9 +118,8 @@ class CheckCommand(commands.Command):
         if self.opts.check_types.intersection({'all', 'obsoleted'}):
             for pkg in q:
                 for obsolete in pkg.obsoletes:
-                    obsoleted = q.filter(provides=[obsolete],
-                                         name=str(obsolete).split()[0])
-                    if len(obsoleted):
+                    obsoleted = index.named_providers(obsolete)
+                    if obsoleted:
                         msg = _("{} is obsoleted by {}").format(
                             self.base.output.term.bold(obsoleted[0]),
                             self.base.output.term.bold(pkg))
@@ -133,7 +128,7 @@ class CheckCommand(commands.Command):
         if self.opts.check_types.intersection({'all', 'provides'}):
             for pkg in q:
                 for provide in pkg.provides:
-                    if pkg not in q.filter(provides=[provide]):
+                    if pkg not in index.providers(provide):
                         msg = _("{} provides {} but it cannot be found")
                         output_set.add(msg.format(
                             self.base.output.term.bold(pkg),
@@ -145,3 +140,120 @@ class CheckCommand(commands.Command):
         if output_set:
             raise dnf.exceptions.Error(
                 'Check discovered {} problem(s)'.format(len(output_set)))
+
+    def _unsatisfied_rich_deps(self, deps):
+        """Return the rich deps the installed packages don't satisfy.
+
+        All of them are resolved in a single solver run, separate runs are
+        only needed to tell the failing ones apart."""
+        sack = dnf.sack.rpmdb_sack(self.base)
+
+        def solved(deps):
+            goal = dnf.goal.Goal(sack)
+            goal.protect_running_kernel = self.base.conf.protect_running_kernel
+            for dep in deps:
+                selector = dnf.selector.Selector(sack)
+                selector.set(provides=dep)
+                goal.install(select=selector, optional=False)
+            # there are only @system repo in sack, therefore solved is only in case
+            # when rich deps don't require any additional package
+            return goal.run()
+
+        if solved(deps):
+            return set()
+        return {dep for dep in deps if not solved([dep])}
+
+
+# comparison operators of versioned dependencies
+_DEP_LT = 1
+_DEP_GT = 2
+_DEP_EQ = 4
+_DEP_OPERATORS = {'<': _DEP_LT, '>': _DEP_GT, '=': _DEP_EQ,
+                  '<=': _DEP_LT | _DEP_EQ, '>=': _DEP_GT | _DEP_EQ}
+
+
+def _split_dep(dep):
+    """Return (name, operator flags, evr) of a simple dependency, flags and evr
+    are None for an unversioned one. Return None for other dependencies."""
+    parts = str(dep).split()
+    if len(parts) == 1 and not parts[0].startswith('('):
+        return parts[0], None, None
+    if len(parts) == 3 and parts[1] in _DEP_OPERATORS:
+        return parts[0], _DEP_OPERATORS[parts[1]], parts[2]
+    return None
+
+
+def _split_evr(evr):
+    epoch, _, version_release = evr.rpartition(':')
+    version, _, release = version_release.partition('-')
+    return epoch or '0', version, release
+
+
+class _InstalledIndex(object):
+    """Resolves dependencies against the installed packages. Simple versioned
+    and unversioned dependencies are answered from an index of the installed
+    provides, with the matching rules of libsolv. Any other dependency is
+    looked up in the sack at most once."""
+
+    def __init__(self, query, evr_cmp):
+        self._query = query
+        self._evr_cmp = evr_cmp
+        self._by_name = None
+        self._provides = None
+        self._providers = {}
+
+    def providers(self, dep):
+        """Return the set of installed packages providing dep"""
+        key = str(dep)
+        result = self._providers.get(key)
+        if result is None:
+            result = set(self._query.filter(provides=[dep]))
+            self._providers[key] = result
+        return result
+
+    def _intersect(self, provide, require):
+        """Whether the ranges of a provide and a require of the same name overlap"""
+        pflags, pevr = provide
+        flags, evr = require
+        if pflags is None or flags is None:
+            return True
+        pevr = _split_evr(pevr)
+        evr = _split_evr(evr)
+        if not pevr[2] or not evr[2]:
+            # a missing release matches any release
+            pevr, evr = pevr[:2], evr[:2]
+        cmp = self._evr_cmp('%s:%s' % (pevr[0], '-'.join(pevr[1:])),
+                            '%s:%s' % (evr[0], '-'.join(evr[1:])))
+        if cmp < 0:
+            return bool(pflags & _DEP_GT or flags & _DEP_LT)
+        if cmp > 0:
+            return bool(pflags & _DEP_LT or flags & _DEP_GT)
+        return bool(pflags & flags)
+
+    def satisfied(self, dep):
+        if self._provides is None:
+            self._provides = {}
+            for pkg in self._query:
+                for provide in pkg.provides:
+                    split = _split_dep(provide)
+                    if split is not None:
+                        name, flags, evr = split
+                        self._provides.setdefault(name, []).append((flags, evr))
+        split = _split_dep(dep)
+        if split is None:
+            return bool(self.providers(dep))
+        name, flags, evr = split
+        provides = self._provides.get(name)
+        if provides is None:
+            # file dependencies are not among the provides
+            return flags is None and bool(self.providers(dep))
+        return any(self._intersect(provide, (flags, evr)) for provide in provides)
+
+    def named_providers(self, dep):
+        """Return installed packages providing dep whose name is the name of dep"""
+        if self._by_name is None:
+            self._by_name = self._query._name_dict()
+        name = str(dep).split()[0]
+        if name not in self._by_name:
+            return []
+        return [pkg for pkg in self._by_name[name] if pkg in self.providers(dep)]
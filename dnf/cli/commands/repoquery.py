@@ -24,6 +24,7 @@ from dnf.cli.option_parser import OptionParser
 
 import argparse
 import datetime
+import json
 import logging
 import re
 import sys
@@ -94,6 +95,25 @@ def rpm2py_format(queryformat):
     return fmt
 
 
+def queryformat_tags(queryformat):
+    """Return the known tags used in a rpm like QUERYFMT."""
+    tags = []
+    for item in QFORMAT_MATCH.finditer(queryformat):
+        key = item.groups()[1].lower()
+        key = OPTS_MAPPING.get(key, key)
+        if key in ALLOWED_QUERY_TAGS and key not in tags:
+            tags.append(key)
+    return tags
+
+
+def _json_value(value):
+    if isinstance(value, list):
+        return sorted({dnf.i18n.ucd(item) for item in value})
+    if value is None or isinstance(value, (bool, int)):
+        return value
+    return dnf.i18n.ucd(value)
+
+
 class _CommaSplitCallback(OptionParser._SplitCallback):
     SPLITTER = r'\s*,\s*'
 
@@ -170,6 +190,11 @@ class RepoQueryCommand(commands.Command):
                             help=_('resolve capabilities to originating package(s)'))
         parser.add_argument("--tree", action="store_true",
                             help=_('show recursive tree for package(s)'))
+        parser.add_argument("--tree-max-depth", dest='tree_max_depth', type=int, metavar='DEPTH',
+                            help=_('used with --tree, show at most DEPTH levels below the '
+                                   'given package(s)'))
+        parser.add_argument("--tree-max-nodes", dest='tree_max_nodes', type=int, metavar='COUNT',
+                            help=_('used with --tree, stop after COUNT packages are shown'))
         parser.add_argument('--srpm', action='store_true',
                             help=_('operate on corresponding source RPM'))
         parser.add_argument("--latest-limit", dest='latest_limit', type=int,
@@ -196,6 +221,12 @@ class RepoQueryCommand(commands.Command):
                              help=_('display format for listing packages: '
                                     '"%%{name} %%{version} ...", '
                                     'use --querytags to view full tag list'))
+        parser.add_argument('--stream', action='store_true',
+                            help=_('print packages as soon as they are found, '
+                                   'without sorting and removing duplicate lines'))
+        parser.add_argument('--ndjson', action='store_true',
+                            help=_('print a JSON object with the --queryformat tags '
+                                   'per line; implies --stream'))
         parser.add_argument('--querytags', action='store_true',
                             help=_('show available tags to use with '
                                    '--queryformat'))
@@ -292,6 +323,27 @@ class RepoQueryCommand(commands.Command):
         if self.opts.querytags:
             return
 
+        if self.opts.ndjson:
+            for option, enabled in (('--info', self.opts.queryinfo),
+                                    ('--list', self.opts.queryfilelist),
+                                    ('--source', self.opts.querysourcerpm),
+                                    ('--changelogs', self.opts.querychangelogs)):
+                if enabled:
+                    self.cli._option_conflict("--ndjson", option)
+            self.opts.stream = True
+
+        if self.opts.stream:
+            # these options have their own reports, which are not streamed
+            for option, enabled in (('--tree', self.opts.tree),
+                                    ('--' + str(self.opts.packageatr), self.opts.packageatr),
+                                    ('--resolve', self.opts.resolve),
+                                    ('--location', self.opts.location),
+                                    ('--deplist', self.opts.deplist),
+                                    ('--groupmember', self.opts.groupmember)):
+                if enabled:
+                    self.cli._option_conflict("--ndjson" if self.opts.ndjson else "--stream",
+                                              option)
+
         if self.opts.resolve and not self.opts.packageatr:
             raise dnf.cli.CliError(
                 _("Option '--resolve' has to be used together with one of the "
@@ -314,6 +366,11 @@ class RepoQueryCommand(commands.Command):
                     _("argument {} requires --whatrequires or --whatdepends option".format(
                         '--alldeps' if self.opts.alldeps else '--exactdeps')))
 
+        if self.opts.tree_max_depth is not None and self.opts.tree_max_depth < 0:
+            raise dnf.cli.CliError(_("argument {}: must not be negative").format('--tree-max-depth'))
+        if self.opts.tree_max_nodes is not None and self.opts.tree_max_nodes < 1:
+            raise dnf.cli.CliError(_("argument {}: must be at least 1").format('--tree-max-nodes'))
+
         if self.opts.srpm:
             self.base.repos.enable_source_repos()
 
@@ -322,6 +379,7 @@ class RepoQueryCommand(commands.Command):
             demands.available_repos = True
 
         demands.sack_activation = True
+        demands.sack_snapshot = True
 
         if self.opts.querychangelogs:
             demands.changelogs = True
@@ -580,16 +638,19 @@ class RepoQueryCommand(commands.Command):
             self.tree_seed(q, orquery, self.opts)
             return
 
+        if self.opts.list == 'userinstalled':
+            # resolve the reasons of all packages at once
+            q = q.filter(pkg=self.base.history.filter_user_installed(q.run()))
+
         pkgs = set()
         if self.opts.packageatr:
             rels = set()
             for pkg in q.run():
-                if self.opts.list != 'userinstalled' or self.base.history.user_installed(pkg):
-                    if self.opts.packageatr == 'depends':
-                        rels.update(pkg.requires + pkg.enhances + pkg.suggests +
-                                    pkg.supplements + pkg.recommends)
-                    else:
-                        rels.update(getattr(pkg, OPTS_MAPPING[self.opts.packageatr]))
+                if self.opts.packageatr == 'depends':
+                    rels.update(pkg.requires + pkg.enhances + pkg.suggests +
+                                pkg.supplements + pkg.recommends)
+                else:
+                    rels.update(getattr(pkg, OPTS_MAPPING[self.opts.packageatr]))
             if self.opts.resolve:
                 # find the providing packages and show them
                 if self.opts.list == "installed":
@@ -611,33 +672,18 @@ class RepoQueryCommand(commands.Command):
                 if location is not None:
                     pkgs.add(location)
         elif self.opts.deplist:
-            pkgs = []
-            for pkg in sorted(set(q.run())):
-                if self.opts.list != 'userinstalled' or self.base.history.user_installed(pkg):
-                    deplist_output = []
-                    deplist_output.append('package: ' + str(pkg))
-                    for req in sorted([str(req) for req in pkg.requires]):
-                        deplist_output.append('  dependency: ' + req)
-                        subject = dnf.subject.Subject(req)
-                        query = subject.get_best_query(self.base.sack)
-                        query = self.filter_repo_arch(
-                            self.opts, query.available())
-                        if not self.opts.verbose:
-                            query = query.latest()
-                        for provider in query.run():
-                            deplist_output.append('   provider: ' + str(provider))
-                    pkgs.append('\n'.join(deplist_output))
-            if pkgs:
-                print('\n\n'.join(pkgs))
+            self._deplist_report(q)
             return
         elif self.opts.groupmember:
             self._group_member_report(q)
             return
 
+        elif self.opts.stream:
+            self._stream_report(q)
+            return
         else:
             for pkg in q.run():
-                if self.opts.list != 'userinstalled' or self.base.history.user_installed(pkg):
-                    pkgs.add(self.build_format_fn(self.opts, pkg))
+                pkgs.add(self.build_format_fn(self.opts, pkg))
 
         if pkgs:
             if self.opts.queryinfo:
@@ -645,6 +691,43 @@ class RepoQueryCommand(commands.Command):
             else:
                 print("\n".join(sorted(pkgs)))
 
+    def _stream_report(self, query):
+        if self.opts.ndjson:
+            tags = queryformat_tags(self.opts.queryformat)
+            for pkg in query:
+                record = {tag: _json_value(getattr(pkg, tag)) for tag in tags}
+                print(json.dumps(record))
+            return
+        separator = '\n' if self.opts.queryinfo else ''
+        first = True
+        for pkg in query:
+            print(('' if first else separator) + self.build_format_fn(self.opts, pkg))
+            first = False
+
+    def _deplist_report(self, query):
+        # the same requirements repeat across packages, every distinct one
+        # is resolved only once
+        providers = {}
+        first = True
+        for pkg in sorted(set(query.run())):
+            deplist_output = []
+            deplist_output.append('package: ' + str(pkg))
+            for req in sorted([str(req) for req in pkg.requires]):
+                deplist_output.append('  dependency: ' + req)
+                if req not in providers:
+                    subject = dnf.subject.Subject(req)
+                    req_query = subject.get_best_query(self.base.sack)
+                    req_query = self.filter_repo_arch(
+                        self.opts, req_query.available())
+                    if not self.opts.verbose:
+                        req_query = req_query.latest()
+                    providers[req] = ['   provider: ' + str(provider)
+                                      for provider in req_query.run()]
+                deplist_output.extend(providers[req])
+            # print packages as they are done, separated by an empty line
+            print(('' if first else '\n') + '\n'.join(deplist_output))
+            first = False
+
     def _group_member_report(self, query):
         package_conf_dict = {}
         for group in self.base.comps.groups:
@@ -683,26 +766,61 @@ class RepoQueryCommand(commands.Command):
         reqstr = "[" + str(len(requires)) + ": " + ", ".join(requires) + "]"
         print(spacing + r"\_ " + pkg_string + " " + reqstr)
 
-    def tree_seed(self, query, aquery, opts, level=-1, usedpkgs=None):
-        for pkg in sorted(set(query.run()), key=lambda p: p.name):
-            usedpkgs = set() if usedpkgs is None or level == -1 else usedpkgs
-            if pkg.name.startswith("rpmlib") or pkg.name.startswith("solvable"):
-                return
-            self.grow_tree(level, pkg, opts)
-            if pkg not in usedpkgs:
-                usedpkgs.add(pkg)
-                if opts.packageatr:
-                    strpkg = getattr(pkg, opts.packageatr)
-                    ar = {}
-                    for name in set(strpkg):
-                        pkgquery = self.base.sack.query().filterm(provides=name)
-                        for querypkg in pkgquery:
-                            ar[querypkg.name + "." + querypkg.arch] = querypkg
-                    pkgquery = self.base.sack.query().filterm(pkg=list(ar.values()))
-                else:
+    def tree_seed(self, query, aquery, opts):
+        """Print the tree of packages in query. Children of every package are
+        computed only once and the tree is walked with an explicit stack."""
+        children = {}
+        providers = {}
+        dependents = {}
+
+        def node_children(pkg):
+            if pkg in children:
+                return children[pkg]
+            if opts.packageatr:
+                ar = {}
+                for reldep in set(getattr(pkg, opts.packageatr)):
+                    key = str(reldep)
+                    if key not in providers:
+                        providers[key] = self.base.sack.query().filterm(provides=reldep).run()
+                    for querypkg in providers[key]:
+                        ar[querypkg.name + "." + querypkg.arch] = querypkg
+                pkgs = ar.values()
+            else:
+                if pkg.name not in dependents:
                     pkgquery = self.by_all_deps((pkg.name, ), aquery) if opts.alldeps \
                         else aquery.filter(requires__glob=pkg.name)
-                self.tree_seed(pkgquery, aquery, opts, level + 1, usedpkgs)
+                    dependents[pkg.name] = pkgquery.run()
+                pkgs = dependents[pkg.name]
+            children[pkg] = self._tree_level(pkgs)
+            return children[pkg]
+
+        printed = 0
+        for root in self._tree_level(query.run()):
+            usedpkgs = set()
+            stack = [(-1, root)]
+            while stack:
+                level, pkg = stack.pop()
+                self.grow_tree(level, pkg, opts)
+                printed += 1
+                if opts.tree_max_nodes is not None and printed >= opts.tree_max_nodes:
+                    return
+                if pkg in usedpkgs:
+                    continue
+                usedpkgs.add(pkg)
+                if opts.tree_max_depth is not None and level + 1 >= opts.tree_max_depth:
+                    continue
+                stack.extend((level + 1, child) for child in reversed(node_children(pkg)))
+
+    @staticmethod
+    def _tree_level(pkgs):
+        """Sort packages of one tree level by name, up to the first rpmlib or
+        solvable pseudo-package."""
+        level = []
+        for pkg in sorted(set(pkgs), key=lambda p: p.name):
+            if pkg.name.startswith("rpmlib") or pkg.name.startswith("solvable"):
+                break
+            level.append(pkg)
+        return level
 
 
 class PackageWrapper(object):
@@ -66,7 +66,8 @@ class UpdateInfoCommand(commands.Command):
     def __init__(self, cli):
         """Initialize the command."""
         super(UpdateInfoCommand, self).__init__(cli)
-        self._installed_query = None
+        self._installed_evrs = None
+        self._newer_equal_cache = {}
 
     @staticmethod
     def set_argparser(parser):
@@ -183,10 +184,19 @@ class UpdateInfoCommand(commands.Command):
             self.display_summary(apkg_adv_insts, description)
 
     def _newer_equal_installed(self, apackage):
-        if self._installed_query is None:
-            self._installed_query = self.base.sack.query().installed().apply()
-        q = self._installed_query.filter(name=apackage.name, evr__gte=apackage.evr)
-        return len(q) > 0
+        if self._installed_evrs is None:
+            # name -> EVRs of installed packages, built once for all rows
+            self._installed_evrs = {}
+            for pkg in self.base.sack.query().installed():
+                self._installed_evrs.setdefault(pkg.name, []).append(pkg.evr)
+        key = (apackage.name, apackage.evr)
+        result = self._newer_equal_cache.get(key)
+        if result is None:
+            evr_cmp = self.base.sack.evr_cmp
+            result = any(evr_cmp(evr, apackage.evr) >= 0
+                         for evr in self._installed_evrs.get(apackage.name, ()))
+            self._newer_equal_cache[key] = result
+        return result
 
     def _advisory_matcher(self, advisory):
         if not self.opts._advisory_types \
@@ -217,9 +227,14 @@ class UpdateInfoCommand(commands.Command):
 
     def _apackage_advisory_installed(self, pkgs_query, cmptype, specs):
         """Return (adv. package, advisory, installed) triplets."""
+        # many advisory packages belong to one advisory, match it only once
+        advisory_matches = {}
         for apackage in pkgs_query.get_advisory_pkgs(cmptype):
             advisory = apackage.get_advisory(self.base.sack)
-            advisory_match = self._advisory_matcher(advisory)
+            advisory_match = advisory_matches.get(advisory.id)
+            if advisory_match is None:
+                advisory_match = self._advisory_matcher(advisory)
+                advisory_matches[advisory.id] = advisory_match
             apackage_match = any(fnmatch.fnmatchcase(apackage.name, pat)
                                  for pat in self.opts.spec)
             if advisory_match or apackage_match:
@@ -62,3 +62,7 @@ class DemandSheet(object):
     # repositories packages (e.g. versionlock).
     # If it stays None, the demands.resolving is used as a fallback.
     plugin_filtering_enabled = _BoolDefault(None)
+
+    # Read-only commands which do not care about the module state can use the
+    # sack snapshot (see the sack_snapshot configuration option).
+    sack_snapshot = _BoolDefault(False)
@@ -52,6 +52,7 @@ class OptionParser(argparse.ArgumentParser):
         if reset_usage:
             self._cmd_usage = {}      # names, summary for dnf commands, to build usage
             self._cmd_groups = set()  # cmd groups added (main, plugin)
+            self._cmd_lazy = []       # built-in commands not imported yet, with their group
 
     def error(self, msg):
         """Output an error message, and exit the program.
@@ -365,6 +366,16 @@ class OptionParser(argparse.ArgumentParser):
 
     def _add_cmd_usage(self, cmd, group):
         """ store usage info about a single dnf command."""
+        if hasattr(cmd, 'load'):
+            # lazily registered command, its module is imported only
+            # when the usage is really shown
+            if cmd not in (lazy for _group, lazy in self._cmd_lazy):
+                self._cmd_lazy.append((group, cmd))
+                self._cmd_groups.add(group)
+            return
+        if any(lazy.command_cls is cmd for _group, lazy in self._cmd_lazy):
+            # loaded since it was added
+            return
         summary = dnf.i18n.ucd(cmd.summary)
         name = dnf.i18n.ucd(cmd.aliases[0])
         if not name in self._cmd_usage:
@@ -385,6 +396,12 @@ class OptionParser(argparse.ArgumentParser):
         desc = {'main': _('List of Main Commands:'),
                 'plugin': _('List of Plugin Commands:')}
         usage = '%s [options] COMMAND\n' % dnf.util.MAIN_PROG
+        for group, lazy in self._cmd_lazy:
+            cmd = lazy.load()
+            name = dnf.i18n.ucd(cmd.aliases[0])
+            if not name in self._cmd_usage:
+                self._cmd_usage[name] = (group, dnf.i18n.ucd(cmd.summary))
+        self._cmd_lazy = []
         for grp in ['main', 'plugin']:
             if not grp in self._cmd_groups:
                 # dont add plugin usage, if we dont have plugins
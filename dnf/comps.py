@@ -31,6 +31,7 @@ import dnf.i18n
 import dnf.util
 import fnmatch
 import gettext
+import hashlib
 import itertools
 import libcomps
 import locale
@@ -49,6 +50,26 @@ OPTIONAL    = libdnf.transaction.CompsPackageType_OPTIONAL
 
 ALL_TYPES = CONDITIONAL | DEFAULT | MANDATORY | OPTIONAL
 
+# write the merged comps without losing anything the parsed files contain: the
+# arch attributes for a later arch_filter(), empty objects and explicit defaults
+_XML_OPTIONS = {
+    'arch_output': True,
+    'empty_groups': True,
+    'empty_categories': True,
+    'empty_environments': True,
+    'empty_langpacks': True,
+    'empty_blacklist': True,
+    'empty_whiteout': True,
+    'empty_packages': True,
+    'empty_grouplist': True,
+    'empty_optionlist': True,
+    'uservisible_explicit': True,
+    'biarchonly_explicit': True,
+    'default_explicit': True,
+    'gid_default_explicit': True,
+    'bao_explicit': True,
+}
+
 
 def _internal_comps_length(comps):
     collections = (comps.categories, comps.groups, comps.environments)
@@ -86,6 +107,51 @@ def _by_pattern(pattern, case_sensitive, sqn):
     return ret
 
 
+def _cache_key(comps_files):
+    """Digest of the (repo id, comps file) pairs a merged comps is read from."""
+    digest = hashlib.sha256()
+    for repo_id, fn in comps_files:
+        digest.update(repo_id.encode('utf-8'))
+        try:
+            with open(fn, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        except (IOError, OSError):
+            return None
+    return digest.hexdigest()
+
+
+class _Index(object):
+    """Comps objects of one kind by id, by name and by translated name."""
+
+    def __init__(self, iobjs, build):
+        self.iobjs = list(iobjs)
+        self.build = build
+        self.by_id = {}
+        self.exact = {}  # id and name, matched first
+        self.by_ui_name = {}
+        self.folded = {}  # lowercased id, name and translated name
+        for pos, iobj in enumerate(self.iobjs):
+            obj = build(iobj)
+            self.by_id.setdefault(obj.id, pos)
+            for key in (obj.id, obj.name):
+                if key is not None:
+                    self.exact.setdefault(key, set()).add(pos)
+            if obj.ui_name is not None:
+                self.by_ui_name.setdefault(obj.ui_name, set()).add(pos)
+            for key in (obj.id, obj.name, obj.ui_name):
+                if key is not None:
+                    self.folded.setdefault(key.lower(), set()).add(pos)
+
+    def lookup(self, pattern, case_sensitive):
+        """Return positions matching a pattern without wildcards, like _by_pattern."""
+        found = self.exact.get(pattern)
+        if found:
+            return found
+        if case_sensitive:
+            return self.by_ui_name.get(pattern, set())
+        return self.folded.get(pattern.lower(), set())
+
+
 def _fn_display_order(group):
     return sys.maxsize if group.display_order is None else group.display_order
 
@@ -347,6 +413,7 @@ class Comps(object):
     def __init__(self):
         self._i = libcomps.Comps()
         self._langs = _Langs()
+        self._indexes = {}
 
     def __len__(self):
         return _internal_comps_length(self._i)
@@ -371,6 +438,37 @@ class Comps(object):
             errors = comps.get_last_errors()
             raise CompsError(' '.join(errors))
         self._i += comps
+        self._indexes = {}
+
+    def _write_xml_filename(self, fn):
+        self._i.xml_f(fn, xml_options=_XML_OPTIONS)
+
+    def _index(self, kind):
+        # translated names follow the locale
+        key = (kind, tuple(self._langs.get()))
+        index = self._indexes.get(key)
+        if index is None:
+            build = {'categories': self._build_category,
+                     'environments': self._build_environment,
+                     'groups': self._build_group}[kind]
+            index = self._indexes[key] = _Index(getattr(self._i, kind), build)
+        return index
+
+    def _by_pattern(self, kind, pattern, case_sensitive):
+        """Return objects of a kind matching the pattern, by the index if possible."""
+        pattern = dnf.i18n.ucd(pattern)
+        index = self._index(kind)
+        if not dnf.util.is_glob_pattern(pattern):
+            return {index.build(index.iobjs[pos])
+                    for pos in index.lookup(pattern, case_sensitive)}
+        return _by_pattern(pattern, case_sensitive, [index.build(iobj) for iobj in index.iobjs])
+
+    def _by_id(self, kind, id_):
+        index = self._index(kind)
+        pos = index.by_id.get(id_)
+        if pos is None:
+            return None
+        return index.build(index.iobjs[pos])
 
     @property
     def categories(self):
@@ -386,7 +484,7 @@ class Comps(object):
     def categories_by_pattern(self, pattern, case_sensitive=False):
         # :api
         assert dnf.util.is_string_type(pattern)
-        return _by_pattern(pattern, case_sensitive, self.categories)
+        return self._by_pattern('categories', pattern, case_sensitive)
 
     def categories_iter(self):
         # :api
@@ -399,7 +497,7 @@ class Comps(object):
 
     def _environment_by_id(self, id):
         assert dnf.util.is_string_type(id)
-        return dnf.util.first(g for g in self.environments_iter() if g.id == id)
+        return self._by_id('environments', id)
 
     def environment_by_pattern(self, pattern, case_sensitive=False):
         # :api
@@ -410,8 +508,7 @@ class Comps(object):
     def environments_by_pattern(self, pattern, case_sensitive=False):
         # :api
         assert dnf.util.is_string_type(pattern)
-        envs = list(self.environments_iter())
-        found_envs = _by_pattern(pattern, case_sensitive, envs)
+        found_envs = self._by_pattern('environments', pattern, case_sensitive)
         return sorted(found_envs, key=_fn_display_order)
 
     def environments_iter(self):
@@ -425,7 +522,7 @@ class Comps(object):
 
     def _group_by_id(self, id_):
         assert dnf.util.is_string_type(id_)
-        return dnf.util.first(g for g in self.groups_iter() if g.id == id_)
+        return self._by_id('groups', id_)
 
     def group_by_pattern(self, pattern, case_sensitive=False):
         # :api
@@ -436,7 +533,7 @@ class Comps(object):
     def groups_by_pattern(self, pattern, case_sensitive=False):
         # :api
         assert dnf.util.is_string_type(pattern)
-        grps = _by_pattern(pattern, case_sensitive, list(self.groups_iter()))
+        grps = self._by_pattern('groups', pattern, case_sensitive)
         return sorted(grps, key=_fn_display_order)
 
     def groups_iter(self):
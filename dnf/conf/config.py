@@ -59,6 +59,8 @@ class BaseConfig(object):
     def __init__(self, config=None, section=None, parser=None):
         self.__dict__["_config"] = config
         self._section = section
+        # options defined only in the Python layer, unknown to libdnf
+        self._py_options = {}
 
     def __getattr__(self, name):
         if "_config" not in self.__dict__:
@@ -91,31 +93,54 @@ class BaseConfig(object):
                 except RuntimeError:
                     value = ""
                 out.append('%s: %s' % (optBind.first, value))
+        for name, option in sorted(self._py_options.items()):
+            out.append('%s: %s' % (name, option.getValueString()))
         return '\n'.join(out)
 
-    def _has_option(self, name):
-        method = getattr(self._config, name, None)
-        return method is not None
+    def _add_py_option(self, name, option):
+        """Register an option which is defined only in the Python layer.
 
-    def _get_value(self, name):
+        The option is exposed as a property and can be set from the
+        configuration file and from --setopt like the libdnf options."""
+        self._py_options[name] = option
+        if not hasattr(type(self), name):
+            def prop_get(obj):
+                return obj._py_options[name].getValue()
+
+            def prop_set(obj, val):
+                obj._set_value(name, val, PRIO_RUNTIME)
+
+            setattr(type(self), name, property(prop_get, prop_set))
+
+    def _get_option(self, name):
+        if name in self._py_options:
+            return self._py_options[name]
         method = getattr(self._config, name, None)
         if method is None:
             return None
-        return method().getValue()
+        return method()
+
+    def _has_option(self, name):
+        return self._get_option(name) is not None
+
+    def _get_value(self, name):
+        option = self._get_option(name)
+        if option is None:
+            return None
+        return option.getValue()
 
     def _get_priority(self, name):
-        method = getattr(self._config, name, None)
-        if method is None:
+        option = self._get_option(name)
+        if option is None:
             return None
-        return method().getPriority()
+        return option.getPriority()
 
     def _set_value(self, name, value, priority=PRIO_RUNTIME):
         """Set option's value if priority is equal or higher
            than current priority."""
-        method = getattr(self._config, name, None)
-        if method is None:
+        option = self._get_option(name)
+        if option is None:
             raise Exception("Option \"" + name + "\" does not exists")
-        option = method()
         if value is None:
             try:
                 option.set(priority, value)
@@ -149,6 +174,12 @@ class BaseConfig(object):
                     except RuntimeError as e:
                         logger.error(_('Invalid configuration value: %s=%s in %s; %s'),
                                      ucd(name), ucd(value), ucd(filename), str(e))
+                elif name in self._py_options:
+                    try:
+                        self._py_options[name].set(priority, value)
+                    except RuntimeError as e:
+                        logger.error(_('Invalid configuration value: %s=%s in %s; %s'),
+                                     ucd(name), ucd(value), ucd(filename), str(e))
                 else:
                     if name == 'arch' and hasattr(self, name):
                         setattr(self, name, value)
@@ -171,6 +202,8 @@ class BaseConfig(object):
                     output.append('%s = %s' % (optBind.first, optBind.second.getValueString()))
                 except RuntimeError:
                     pass
+        for name, option in sorted(self._py_options.items()):
+            output.append('%s = %s' % (name, option.getValueString()))
 
         return '\n'.join(output) + '\n'
 
@@ -246,6 +279,11 @@ class MainConf(BaseConfig):
         self._config.cachedir().set(PRIO_DEFAULT, cachedir)
         self._config.logdir().set(PRIO_DEFAULT, logdir)
 
+        self._add_py_option('max_parallel_repo_loads', libdnf.conf.OptionNumberInt32(1, 1))
+        self._add_py_option('sack_snapshot', libdnf.conf.OptionBool(False))
+        self._add_py_option('pkgstore', libdnf.conf.OptionString(''))
+        self._add_py_option('pkgstore_max_size', libdnf.conf.OptionNumberInt32(10240, 0))
+
         # track list of temporary files created
         self.tempfiles = []
 
@@ -392,6 +430,13 @@ class MainConf(BaseConfig):
                             raise dnf.exceptions.ConfigError(
                                 _("Error parsing --setopt with key '%s', value '%s': %s")
                                 % (name, val, str(e)), raw_error=str(e))
+                    elif name in self._py_options:
+                        try:
+                            self._py_options[name].set(PRIO_COMMANDLINE, val)
+                        except RuntimeError as e:
+                            raise dnf.exceptions.ConfigError(
+                                _("Error parsing --setopt with key '%s', value '%s': %s")
+                                % (name, val, str(e)), raw_error=str(e))
                     else:
                         # if config option with "name" doesn't exist in _config, it could be defined
                         # only in Python layer
@@ -208,25 +208,38 @@ class RPMTransaction(object):
             except:
                 pass
         self._swdb_ti_pkg = {}
+        # wrapped items, their lists by action and the package sets, built
+        # on first use and dropped whenever an item is added
+        self._items = None
+        self._items_by_action = None
+        self._pkg_sets = {}
 
     # TODO: close trans if needed
 
+    def _invalidate(self):
+        self._items = None
+        self._items_by_action = None
+        self._pkg_sets = {}
+
+    def _get_all_items(self):
+        if self._items is None:
+            if self.transaction:
+                items = self.transaction.getItems()
+            else:
+                items = self.history.swdb.getItems()
+            self._items = [dnf.db.history.RPMTransactionItemWrapper(self.history, i, self)
+                           for i in items if i.getRPMItem()]
+            self._items_by_action = {}
+            for tsi in self._items:
+                self._items_by_action.setdefault(tsi.action, []).append(tsi)
+        return self._items
+
     def __iter__(self):
         # :api
-        if self.transaction:
-            items = self.transaction.getItems()
-        else:
-            items = self.history.swdb.getItems()
-        items = [dnf.db.history.RPMTransactionItemWrapper(self.history, i) for i in items if i.getRPMItem()]
-        return iter(items)
+        return iter(self._get_all_items())
 
     def __len__(self):
-        if self.transaction:
-            items = self.transaction.getItems()
-        else:
-            items = self.history.swdb.getItems()
-        items = [dnf.db.history.RPMTransactionItemWrapper(self.history, i) for i in items if i.getRPMItem()]
-        return len(items)
+        return len(self._get_all_items())
 
     def _pkg_to_swdb_rpm_item(self, pkg):
         rpm_item = self.history.swdb.createRPMItem()
@@ -243,6 +256,7 @@ class RPMTransaction(object):
         if reason is None:
             reason = self.get_reason(pkg)
         result = self.history.swdb.addItem(rpm_item, repoid, action, reason)
+        self._invalidate()
         if replaced_by:
             result.addReplacedBy(replaced_by)
         self._swdb_ti_pkg[result] = pkg
@@ -311,24 +325,34 @@ class RPMTransaction(object):
             return 0
         return 0
 
-    def _populate_rpm_ts(self, ts):
-        """Populate the RPM transaction set."""
+    def _populate_rpm_ts(self, ts, headers=None):
+        """Populate the RPM transaction set.
+
+        The headers of the packages to install are taken from the headers
+        loader if given.
+
+        """
         modular_problems = 0
 
+        def header(pkg):
+            if headers is None:
+                return pkg._header
+            return headers.header(pkg)
+
         for tsi in self:
             try:
                 if tsi.action == libdnf.transaction.TransactionItemAction_DOWNGRADE:
-                    hdr = tsi.pkg._header
+                    hdr = header(tsi.pkg)
                     modular_problems += self._test_fail_safe(hdr, tsi.pkg)
                     ts.addInstall(hdr, tsi, 'u')
                 elif tsi.action == libdnf.transaction.TransactionItemAction_DOWNGRADED:
                     ts.addErase(tsi.pkg.idx)
                 elif tsi.action == libdnf.transaction.TransactionItemAction_INSTALL:
-                    hdr = tsi.pkg._header
+                    hdr = header(tsi.pkg)
                     modular_problems += self._test_fail_safe(hdr, tsi.pkg)
                     ts.addInstall(hdr, tsi, 'i')
                 elif tsi.action == libdnf.transaction.TransactionItemAction_OBSOLETE:
-                    hdr = tsi.pkg._header
+                    hdr = header(tsi.pkg)
                     modular_problems += self._test_fail_safe(hdr, tsi.pkg)
                     ts.addInstall(hdr, tsi, 'u')
                 elif tsi.action == libdnf.transaction.TransactionItemAction_OBSOLETED:
@@ -336,7 +360,7 @@ class RPMTransaction(object):
                 elif tsi.action == libdnf.transaction.TransactionItemAction_REINSTALL:
                     # note: in rpm 4.12 there should not be set
                     # rpm.RPMPROB_FILTER_REPLACEPKG to work
-                    hdr = tsi.pkg._header
+                    hdr = header(tsi.pkg)
                     modular_problems += self._test_fail_safe(hdr, tsi.pkg)
                     ts.addReinstall(hdr, tsi)
                 elif tsi.action == libdnf.transaction.TransactionItemAction_REINSTALLED:
@@ -345,7 +369,7 @@ class RPMTransaction(object):
                 elif tsi.action == libdnf.transaction.TransactionItemAction_REMOVE:
                     ts.addErase(tsi.pkg.idx)
                 elif tsi.action == libdnf.transaction.TransactionItemAction_UPGRADE:
-                    hdr = tsi.pkg._header
+                    hdr = header(tsi.pkg)
                     modular_problems += self._test_fail_safe(hdr, tsi.pkg)
                     ts.addInstall(hdr, tsi, 'u')
                 elif tsi.action == libdnf.transaction.TransactionItemAction_UPGRADED:
@@ -361,29 +385,30 @@ class RPMTransaction(object):
 
         return ts
 
+    def _pkg_set(self, actions):
+        actions = tuple(actions)
+        result = self._pkg_sets.get(actions)
+        if result is None:
+            result = set()
+            for action in actions:
+                for tsi in self._get_items(action):
+                    try:
+                        result.add(tsi.pkg)
+                    except KeyError:
+                        raise RuntimeError("TransactionItem is has no RPM attached: %s" % tsi)
+            self._pkg_sets[actions] = result
+        return set(result)
+
     @property
     def install_set(self):
         # :api
-        result = set()
-        for tsi in self:
-            if tsi.action in dnf.transaction.FORWARD_ACTIONS:
-                try:
-                    result.add(tsi.pkg)
-                except KeyError:
-                    raise RuntimeError("TransactionItem is has no RPM attached: %s" % tsi)
-        return result
+        return self._pkg_set(dnf.transaction.FORWARD_ACTIONS)
 
     @property
     def remove_set(self):
         # :api
-        result = set()
-        for tsi in self:
-            if tsi.action in dnf.transaction.BACKWARD_ACTIONS + [libdnf.transaction.TransactionItemAction_REINSTALLED]:
-                try:
-                    result.add(tsi.pkg)
-                except KeyError:
-                    raise RuntimeError("TransactionItem is has no RPM attached: %s" % tsi)
-        return result
+        return self._pkg_set(dnf.transaction.BACKWARD_ACTIONS +
+                             [libdnf.transaction.TransactionItemAction_REINSTALLED])
 
     def _rpm_limitations(self):
         """ Ensures all the members can be passed to rpm as they are to perform
@@ -396,4 +421,5 @@ class RPMTransaction(object):
         return None
 
     def _get_items(self, action):
-        return [tsi for tsi in self if tsi.action == action]
+        self._get_all_items()
+        return list(self._items_by_action.get(action, ()))
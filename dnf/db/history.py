@@ -30,11 +30,23 @@ from dnf.exceptions import DatabaseError
 from .group import GroupPersistor, EnvironmentPersistor, RPMTransaction
 
 
+def _is_user_reason(reason):
+    if reason == libdnf.transaction.TransactionItemReason_USER:
+        return True
+    # if reason is not known, consider a package user-installed
+    # because it was most likely installed via rpm
+    if reason == libdnf.transaction.TransactionItemReason_UNKNOWN:
+        return True
+    return False
+
+
 class RPMTransactionItemWrapper(object):
-    def __init__(self, swdb, item):
+    def __init__(self, swdb, item, owner=None):
         assert item is not None
         self._swdb = swdb
         self._item = item
+        # RPMTransaction caching this wrapper, if any
+        self._owner = owner
 
     def __str__(self):
         return self._item.getItem().toStr()
@@ -103,6 +115,9 @@ class RPMTransactionItemWrapper(object):
     @action.setter
     def action(self, value):
         self._item.setAction(value)
+        if self._owner is not None:
+            # the items are indexed by action
+            self._owner._invalidate()
 
     @property
     def reason(self):
@@ -397,6 +412,7 @@ class SwdbInterface(object):
         repoid = self.repo(pkg)
         action = libdnf.transaction.TransactionItemAction_REASON_CHANGE
         ti = self.swdb.addItem(rpm_item, repoid, action, reason)
+        self.rpm._invalidate()
         ti.setState(libdnf.transaction.TransactionItemState_DONE)
         return ti
 
@@ -410,6 +426,27 @@ class SwdbInterface(object):
         """Get repository of package"""
         return self.swdb.getRPMRepo(str(pkg))
 
+    def repos(self, pkgs):
+        """Get repositories of packages as a {pkg: repoid} dict"""
+        return {pkg: self.repo(pkg) for pkg in pkgs}
+
+    def reasons(self, pkgs):
+        """Get reasons of packages as a {pkg: reason} dict
+
+        The reason is resolved once for each (name, arch) of the packages."""
+        na_reasons = {}
+        result = {}
+        for pkg in pkgs:
+            na = (pkg.name, pkg.arch)
+            if na not in na_reasons:
+                na_reasons[na] = self.swdb.resolveRPMTransactionItemReason(pkg.name, pkg.arch, -1)
+            result[pkg] = na_reasons[na]
+        return result
+
+    def filter_user_installed(self, pkgs):
+        """Return the user installed packages out of pkgs, see user_installed()"""
+        return [pkg for pkg, reason in self.reasons(pkgs).items() if _is_user_reason(reason)]
+
     def package_data(self, pkg):
         """Get package data for package"""
         # trans item is returned
@@ -503,13 +540,7 @@ class SwdbInterface(object):
     def user_installed(self, pkg):
         """Returns True if package is user installed"""
         reason = self.swdb.resolveRPMTransactionItemReason(pkg.name, pkg.arch, -1)
-        if reason == libdnf.transaction.TransactionItemReason_USER:
-            return True
-        # if reason is not known, consider a package user-installed
-        # because it was most likely installed via rpm
-        if reason == libdnf.transaction.TransactionItemReason_UNKNOWN:
-            return True
-        return False
+        return _is_user_reason(reason)
 
     def get_erased_reason(self, pkg, first_trans, rollback):
         """Get reason of package before transaction being undone. If package
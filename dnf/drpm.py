@@ -27,9 +27,13 @@ import dnf.callback
 import dnf.logging
 import dnf.repo
 import hawkey
+import itertools
 import logging
 import libdnf.repo
 import os
+import queue
+import subprocess
+import threading
 
 APPLYDELTA = '/usr/bin/applydeltarpm'
 
@@ -81,6 +85,23 @@ class DeltaPayload(dnf.repo.PackagePayload):
         return os.path.join(self.pkg.repo.pkgdir, os.path.basename(location))
 
 
+def _deltarpm_jobs():
+    """Number of parallel delta rebuilds.
+
+    One job per CPU, fewer when the system is already loaded. The load average
+    on Linux also counts the processes waiting for I/O.
+    """
+    try:
+        cpus = os.sysconf('SC_NPROCESSORS_ONLN')
+    except (TypeError, ValueError):
+        cpus = 4
+    try:
+        load = os.getloadavg()[0]
+    except OSError:
+        return cpus
+    return max(1, min(cpus, int(cpus - load + 1)))
+
+
 class DeltaInfo(object):
     def __init__(self, query, progress, deltarpm_percentage=None):
         '''A delta lookup and rebuild context
@@ -90,10 +111,7 @@ class DeltaInfo(object):
         self.deltarpm_installed = False
         if os.access(APPLYDELTA, os.X_OK):
             self.deltarpm_installed = True
-        try:
-            self.deltarpm_jobs = os.sysconf('SC_NPROCESSORS_ONLN')
-        except (TypeError, ValueError):
-            self.deltarpm_jobs = 4
+        self.deltarpm_jobs = _deltarpm_jobs()
         if deltarpm_percentage is None:
             self.deltarpm_percentage = dnf.conf.Conf().deltarpm_percentage
         else:
@@ -101,9 +119,14 @@ class DeltaInfo(object):
         self.query = query
         self.progress = progress
 
-        self.queue = []
-        self.jobs = {}
+        # rebuilds waiting for a worker, the biggest packages go first
+        self.queue = queue.PriorityQueue()
+        # (payload, return code) of the finished rebuilds
+        self.done = queue.Queue()
+        self.pending = 0
+        self.workers = []
         self.err = {}
+        self._order = itertools.count()
 
     def delta_factory(self, po, progress):
         '''Turn a po to Delta RPM po, if possible'''
@@ -131,12 +154,11 @@ class DeltaInfo(object):
             return DeltaPayload(self, best_delta, po, progress)
         return None
 
-    def job_done(self, pid, code):
+    def job_done(self, pload, code):
         # handle a finished delta rebuild
-        logger.log(dnf.logging.SUBDEBUG, 'drpm: %d: return code: %d, %d', pid,
-                   code >> 8, code & 0xff)
+        logger.log(dnf.logging.SUBDEBUG, 'drpm: %s: return code: %d', pload, code)
 
-        pload = self.jobs.pop(pid)
+        self.pending -= 1
         pkg = pload.pkg
         if code != 0:
             unlink_f(pload.pkg.localPkg())
@@ -147,33 +169,54 @@ class DeltaInfo(object):
             os.unlink(pload.localPkg())
             self.progress.end(pload, dnf.callback.STATUS_DRPM, _('done'))
 
-    def start_job(self, pload):
-        # spawn a delta rebuild job
-        spawn_args = [APPLYDELTA, APPLYDELTA,
-                      '-a', pload.pkg.arch,
-                      pload.localPkg(), pload.pkg.localPkg()]
-        pid = os.spawnl(os.P_NOWAIT, *spawn_args)
-        logger.log(dnf.logging.SUBDEBUG, 'drpm: spawned %d: %s', pid,
-                   ' '.join(spawn_args[1:]))
-        self.jobs[pid] = pload
+    def run_job(self, pload):
+        # run a delta rebuild, called from the worker threads
+        args = [APPLYDELTA, '-a', pload.pkg.arch, pload.localPkg(), pload.pkg.localPkg()]
+        logger.log(dnf.logging.SUBDEBUG, 'drpm: running: %s', ' '.join(args))
+        try:
+            return subprocess.call(args)
+        except OSError as e:
+            logger.debug('drpm: %s', e)
+            return -1
+
+    def _worker(self):
+        while True:
+            pload = self.queue.get()[2]
+            if pload is None:
+                return
+            try:
+                code = self.run_job(pload)
+            except Exception as e:
+                # the job must be reported as done, wait() would block forever
+                logger.error('drpm: %s: %s', pload, e)
+                code = -1
+            self.done.put((pload, code))
+
+    def _process_done(self, block=False):
+        while self.pending:
+            try:
+                pload, code = self.done.get(block=block)
+            except queue.Empty:
+                return
+            self.job_done(pload, code)
 
     def enqueue(self, pload):
-        # process finished jobs, start new ones
-        while self.jobs:
-            pid, code = os.waitpid(-1, os.WNOHANG)
-            if not pid:
-                break
-            self.job_done(pid, code)
-        self.queue.append(pload)
-        while len(self.jobs) < self.deltarpm_jobs:
-            self.start_job(self.queue.pop(0))
-            if not self.queue:
-                break
+        # process finished jobs, hand the new one to the workers
+        self._process_done()
+        self.pending += 1
+        self.queue.put((-pload._full_size, next(self._order), pload))
+        if len(self.workers) < min(self.pending, self.deltarpm_jobs):
+            worker = threading.Thread(target=self._worker, name='drpm-%d' % len(self.workers))
+            worker.daemon = True
+            worker.start()
+            self.workers.append(worker)
 
     def wait(self):
         '''Wait until all jobs have finished'''
-        while self.jobs:
-            pid, code = os.wait()
-            self.job_done(pid, code)
-            if self.queue:
-                self.start_job(self.queue.pop(0))
+        self._process_done(block=True)
+        for worker in self.workers:
+            # sorts after every real job
+            self.queue.put((float('inf'), next(self._order), None))
+        for worker in self.workers:
+            worker.join()
+        self.workers = []
@@ -31,6 +31,7 @@ import logging
 import os
 import threading
 import time
+import weakref
 
 logger = logging.getLogger("dnf")
 
@@ -58,17 +59,40 @@ def build_rpmdb_lock(persistdir, exit_on_lock):
 
 
 def build_log_lock(logdir, exit_on_lock):
+    # taken while a record is being logged, so waiting is not reported on the console
     return ProcessLock(os.path.join(_fit_lock_dir(logdir), 'log_lock.pid'),
-                       'log', not exit_on_lock)
+                       'log', not exit_on_lock, quiet=True)
+
+
+# lock files held open by this process; a forked child must not keep them
+# flock()ed after the parent releases them
+_HELD_LOCKS = weakref.WeakSet()
+
+
+def _forget_held_locks():
+    for lock in list(_HELD_LOCKS):
+        lock._close_fd()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_held_locks)
 
 
 class ProcessLock(object):
-    def __init__(self, target, description, blocking=False):
+    def __init__(self, target, description, blocking=False, timeout=None, quiet=False):
         self.blocking = blocking
+        self.timeout = timeout
+        self.quiet = quiet
         self.count = 0
         self.description = description
         self.target = target
         self.thread_lock = threading.RLock()
+        # contention of the last acquisition
+        self.holder_pid = None
+        self.wait_time = 0.0
+        # the holder keeps the lock file flock()ed, waiters sleep in flock()
+        # and wake up as soon as it is released
+        self._fd = None
 
     def _lock_thread(self):
         if not self.thread_lock.acquire(blocking=False):
@@ -76,22 +100,62 @@ class ProcessLock(object):
             raise ThreadLockError(msg)
         self.count += 1
 
-    def _try_lock(self, pid):
+    def _is_target(self, fd):
+        try:
+            return os.path.samestat(os.fstat(fd), os.stat(self.target))
+        except OSError:
+            return False
+
+    @staticmethod
+    def _read_pid(fd):
+        try:
+            return int(os.read(fd, 20))
+        except ValueError:
+            # empty or being written
+            return -1
+
+    def _hold(self, fd):
+        if hasattr(os, 'register_at_fork'):
+            self._fd = fd
+            _HELD_LOCKS.add(self)
+            return None
+        return fd
+
+    def _close_fd(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            _HELD_LOCKS.discard(self)
+
+    def _try_lock(self, pid, wait=False):
+        """Try to lock the target for pid.
+
+        Returns a (pid, busy) pair. The pid is our own pid when the lock was
+        taken, otherwise the pid of the holder or -1 when it is not known. busy
+        is True when the holder keeps the lock file flock()ed, so it is worth
+        to wait for it in flock().
+
+        """
         fd = os.open(self.target, os.O_CREAT | os.O_RDWR, 0o644)
 
         try:
             try:
-                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                fcntl.flock(fd, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
             except OSError as e:
                 if e.errno == errno.EWOULDBLOCK:
-                    return -1
+                    return self._read_pid(fd), True
                 raise
 
+            if not self._is_target(fd):
+                # unlinked by the holder while we waited, try the new one
+                return -1, False
+
             old_pid = os.read(fd, 20)
             if len(old_pid) == 0:
                 # empty file, write our pid
                 os.write(fd, str(pid).encode('utf-8'))
-                return pid
+                fd = self._hold(fd)
+                return pid, False
 
             try:
                 old_pid = int(old_pid)
@@ -104,19 +168,23 @@ class ProcessLock(object):
 
             if old_pid == pid:
                 # already locked by this process
-                return pid
+                fd = self._hold(fd)
+                return pid, False
 
             if not os.access('/proc/%d/stat' % old_pid, os.F_OK):
                 # locked by a dead process, write our pid
                 os.lseek(fd, 0, os.SEEK_SET)
                 os.ftruncate(fd, 0)
                 os.write(fd, str(pid).encode('utf-8'))
-                return pid
+                fd = self._hold(fd)
+                return pid, False
 
-            return old_pid
+            # a live holder not keeping the file flock()ed
+            return old_pid, False
 
         finally:
-            os.close(fd)
+            if fd is not None:
+                os.close(fd)
 
     def _unlock_thread(self):
         self.count -= 1
@@ -125,9 +193,14 @@ class ProcessLock(object):
     def __enter__(self):
         dnf.util.ensure_dir(os.path.dirname(self.target))
         self._lock_thread()
+        if self._fd is not None:
+            # reentrance, the lock file is held already
+            return
+        start = time.monotonic()
+        self.holder_pid = None
         prev_pid = -1
         my_pid = os.getpid()
-        pid = self._try_lock(my_pid)
+        pid, busy = self._try_lock(my_pid)
         while pid != my_pid:
             if pid != -1:
                 if not self.blocking:
@@ -136,12 +209,34 @@ class ProcessLock(object):
                     raise ProcessLockError(msg, pid)
                 if prev_pid != pid:
                     msg = _('Waiting for process with pid %d to finish.') % (pid)
-                    logger.info(msg)
+                    logger.log(logging.DEBUG if self.quiet else logging.INFO, msg)
                     prev_pid = pid
-            time.sleep(1)
-            pid = self._try_lock(my_pid)
+                self.holder_pid = pid
+            waited = time.monotonic() - start
+            if self.timeout is not None and waited >= self.timeout:
+                self._unlock_thread()
+                msg = '%s still locked by %d after %d seconds' % (
+                    self.description, self.holder_pid or -1, waited)
+                raise ProcessLockError(msg, self.holder_pid or -1)
+            if busy and self.blocking and self.timeout is None:
+                pid, busy = self._try_lock(my_pid, wait=True)
+                continue
+            if busy or pid != -1:
+                # poll a holder not keeping the file flock()ed, or when the
+                # wait is limited by the timeout
+                delay = 0.1 if busy else 1
+                if self.timeout is not None:
+                    delay = min(delay, self.timeout - waited)
+                time.sleep(delay)
+            pid, busy = self._try_lock(my_pid)
+        self.wait_time = time.monotonic() - start
+        if self.holder_pid is not None:
+            logger.debug('%s lock acquired after waiting %.3f s for pid %d',
+                         self.description, self.wait_time, self.holder_pid)
 
     def __exit__(self, *exc_args):
         if self.count == 1:
             os.unlink(self.target)
+            # unlinked first, waiters woken up by closing try the new file
+            self._close_fd()
         self._unlock_thread()
@@ -27,9 +27,12 @@ import libdnf.repo
 import logging
 import logging.handlers
 import os
+import stat
 import sys
+import threading
 import time
 import warnings
+import weakref
 import gzip
 
 # :api loggers are: 'dnf', 'dnf.plugin', 'dnf.rpm'
@@ -113,37 +116,155 @@ def compression_rotator(source, dest):
     os.remove(source)
 
 
+# handlers with records not written yet; a forked child must not write them
+# a second time
+_BUFFERED_HANDLERS = weakref.WeakSet()
+
+
+def _drop_buffered_records():
+    for handler in list(_BUFFERED_HANDLERS):
+        handler._buffer = []
+        handler._buffer_time = None
+        # the timer thread does not exist in the child
+        handler._timer = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_drop_buffered_records)
+
+
 class MultiprocessRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating log file shared by concurrent DNF processes.
+
+    Formatted records are buffered and appended in batches. A batch is written
+    once it holds capacity records, when a record of flush_level or above
+    arrives, by a timer flush_interval seconds after its first record, and on
+    flush() or close(). The file size is looked up once per batch. The
+    rotation is serialized between the processes by the log lock, waiting for
+    its holder without polling.
+
+    """
+
+    capacity = 256
+    flush_level = logging.WARNING
+    flush_interval = 1.0
+
     def __init__(self, filename, mode='a', maxBytes=0, backupCount=0, encoding=None, delay=False):
         super(MultiprocessRotatingFileHandler, self).__init__(
             filename, mode, maxBytes, backupCount, encoding, delay)
-        self.rotate_lock = dnf.lock.build_log_lock("/var/log/", True)
+        self.rotate_lock = dnf.lock.build_log_lock("/var/log/", False)
+        self._buffer = []
+        self._buffer_time = None
+        self._last_record = None
+        self._flushing = False
+        self._timer = None
+        _BUFFERED_HANDLERS.add(self)
 
     def emit(self, record):
-        while True:
-            try:
-                if self.shouldRollover(record):
-                    with self.rotate_lock:
-                        # Do rollover while preserving the mode and ACL of the new log file
-                        mode = os.stat(self.baseFilename).st_mode
-                        acl = None
-                        try:
-                            acl = os.getxattr(self.baseFilename, "system.posix_acl_access")
-                        except:
-                            # The extended attribute does not exist or the
-                            # file system does not support them.
-                            pass
-                        self.doRollover()
-                        os.chmod(self.baseFilename, mode)
-                        if acl is not None:
-                            os.setxattr(self.baseFilename, "system.posix_acl_access", acl)
-                logging.FileHandler.emit(self, record)
+        try:
+            self._buffer.append(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+        self._last_record = record
+        now = time.time()
+        if self._buffer_time is None:
+            self._buffer_time = now
+        if self._flushing:
+            # logged while the batch is being written, e.g. by the log lock
+            return
+        if len(self._buffer) >= self.capacity or record.levelno >= self.flush_level \
+                or now - self._buffer_time >= self.flush_interval:
+            self.flush()
+        elif self._timer is None:
+            # bound the time a record can stay in memory, where a crash or
+            # os._exit() would lose it
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = None
+            if self._flushing or not self._buffer:
                 return
-            except (dnf.exceptions.ProcessLockError, dnf.exceptions.ThreadLockError):
-                time.sleep(0.01)
+            self._flushing = True
+            try:
+                while self._buffer:
+                    records = self._buffer
+                    self._buffer = []
+                    self._buffer_time = None
+                    self._write(records)
             except Exception:
-                self.handleError(record)
-                return
+                self.handleError(self._last_record)
+            finally:
+                self._flushing = False
+        finally:
+            self.release()
+
+    def close(self):
+        self.flush()
+        super(MultiprocessRotatingFileHandler, self).close()
+
+    def _write(self, records):
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes <= 0 or not stat.S_ISREG(os.fstat(self.stream.fileno()).st_mode):
+            # like shouldRollover(), never rotate e.g. /dev/null
+            self.stream.write(''.join(records))
+            self.stream.flush()
+            return
+        self.stream.seek(0, 2)
+        size = self.stream.tell()
+        chunk = []
+        for msg in records:
+            # the same condition as shouldRollover(), without the seek per record
+            if size + len(msg) >= self.maxBytes:
+                if chunk:
+                    self.stream.write(''.join(chunk))
+                    chunk = []
+                with self.rotate_lock:
+                    size = self._rollover(len(msg))
+            chunk.append(msg)
+            size += len(msg)
+        self.stream.write(''.join(chunk))
+        self.stream.flush()
+
+    def _rollover(self, msg_size):
+        """Rotate the log file unless another process did, return its new size."""
+        self.stream.flush()
+        try:
+            rotated = not os.path.samestat(os.fstat(self.stream.fileno()),
+                                           os.stat(self.baseFilename))
+        except OSError:
+            rotated = True
+        if rotated:
+            # continue in the file started by the process which rotated it
+            self.stream.close()
+            self.stream = self._open()
+            self.stream.seek(0, 2)
+            size = self.stream.tell()
+            if size + msg_size < self.maxBytes:
+                return size
+        # Do rollover while preserving the mode and ACL of the new log file
+        mode = os.stat(self.baseFilename).st_mode
+        acl = None
+        try:
+            acl = os.getxattr(self.baseFilename, "system.posix_acl_access")
+        except:
+            # The extended attribute does not exist or the
+            # file system does not support them.
+            pass
+        self.doRollover()
+        os.chmod(self.baseFilename, mode)
+        if acl is not None:
+            os.setxattr(self.baseFilename, "system.posix_acl_access", acl)
+        if self.stream is None:
+            self.stream = self._open()
+        return 0
 
 
 def _create_filehandler(logfile, log_size, log_rotate, log_compress):
@@ -36,6 +36,19 @@ import re
 logger = logging.getLogger("dnf")
 
 
+def _replace_file(path, write):
+    """Call write() with a temporary path and rename the result over path.
+
+    Other processes reading path at the same time see either the old or the
+    new content. Raises OSError and IOError.
+
+    """
+    tmp_path = '%s.%d' % (path, os.getpid())
+    dnf.util.ensure_dir(os.path.dirname(path))
+    write(tmp_path)
+    os.rename(tmp_path, path)
+
+
 class JSONDB(object):
 
     def _check_json_db(self, json_path):
@@ -63,6 +76,34 @@ class JSONDB(object):
         with open(json_path, 'w') as f:
             json.dump(content, f)
 
+    def _load_keyed_json_db(self, json_path, key=None):
+        """Return data stored by _save_keyed_json_db() under key.
+
+        Returns None if the file is missing, unreadable or stored under a
+        different key.
+
+        """
+        if not os.path.isfile(json_path):
+            return None
+        try:
+            content = self._get_json_db(json_path, default={})
+        except (IOError, OSError) as e:
+            logger.debug(_("Failed to load %s: %s"), json_path, e)
+            return None
+        if not isinstance(content, dict) or content.get('key') != key:
+            return None
+        return content.get('data')
+
+    def _save_keyed_json_db(self, json_path, data, key=None):
+        """Atomically replace json_path with data stored under key."""
+        try:
+            _replace_file(json_path, lambda tmp_path: self._write_json_db(
+                tmp_path, {'key': key, 'data': data}))
+        except (IOError, OSError) as e:
+            logger.debug(_("Failed to store %s: %s"), json_path, e)
+            return False
+        return True
+
 
 class RepoPersistor(JSONDB):
     """Persistent data kept for repositories.
@@ -137,3 +178,82 @@ class TempfilePersistor(JSONDB):
 
     def empty(self):
         self._empty = True
+
+
+class SackSnapshotPersistor(JSONDB):
+    """Excludes computed for the sack by a previous run.
+
+    Only the last snapshot is kept, it is valid as long as its key matches.
+
+    """
+
+    def __init__(self, cachedir):
+        self.db_path = os.path.join(cachedir, "sack_snapshot.json")
+
+    def load(self, key):
+        return self._load_keyed_json_db(self.db_path, key)
+
+    def save(self, key, snapshot):
+        return self._save_keyed_json_db(self.db_path, snapshot, key)
+
+
+class PluginManifestPersistor(JSONDB):
+    """Statically read declarations of the plugin files in the plugin paths.
+
+    Entries are validated by the caller against the directory and file mtimes.
+
+    """
+
+    def __init__(self, cachedir):
+        self.db_path = os.path.join(cachedir, "plugin_manifest.json")
+
+    def load(self):
+        return self._load_keyed_json_db(self.db_path) or {}
+
+    def save(self, manifest):
+        return self._save_keyed_json_db(self.db_path, manifest)
+
+
+class CompsCachePersistor(object):
+    """Merged comps of the enabled repositories, stored as one XML file.
+
+    The file name carries the key, the digest of the comps files merged into it.
+
+    """
+
+    def __init__(self, cachedir):
+        self.cachedir = cachedir
+
+    def _path(self, key):
+        return os.path.join(self.cachedir, 'comps_cache-%s.xml' % key)
+
+    def load(self, key):
+        path = self._path(key)
+        return path if os.path.isfile(path) else None
+
+    def save(self, key, comps):
+        path = self._path(key)
+        try:
+            _replace_file(path, comps._write_xml_filename)
+            for fn in os.listdir(self.cachedir):
+                old_path = os.path.join(self.cachedir, fn)
+                if fn.startswith('comps_cache-') and fn.endswith('.xml') and old_path != path:
+                    os.unlink(old_path)
+        except (IOError, OSError) as e:
+            logger.debug(_("Failed to store comps cache: %s"), e)
+            return False
+        return True
+
+
+class ReachabilityPersistor(JSONDB):
+    """Time each remote address was last reached by the network probe."""
+
+    def __init__(self, cachedir):
+        self.db_path = os.path.join(cachedir, "reachability.json")
+
+    def load(self):
+        reached = self._load_keyed_json_db(self.db_path)
+        return reached if isinstance(reached, dict) else {}
+
+    def save(self, reached):
+        return self._save_keyed_json_db(self.db_path, reached)
@@ -0,0 +1,186 @@
+# pkgstore.py
+# Content-addressed store of downloaded packages.
+#
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, see
+# <https://www.gnu.org/licenses/>.  Any Red Hat trademarks that are
+# incorporated in the source code or documentation are not subject to the GNU
+# General Public License and may only be used or replicated with the express
+# permission of Red Hat, Inc.
+#
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from dnf.i18n import _
+from dnf.yum.misc import unlink_f
+
+import dnf.persistor
+import dnf.util
+import fcntl
+import logging
+import os
+import shutil
+
+logger = logging.getLogger("dnf")
+
+# ioctl cloning a file's extents, <linux/fs.h>
+_FICLONE = getattr(fcntl, 'FICLONE', 0x40049409)
+
+
+def _reflink(src, dst):
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+
+
+def _clone(src, dst):
+    """Atomically create dst with the content of src.
+
+    The data blocks are shared with src by a reflink if the filesystem supports
+    it, otherwise they are copied. Never a hardlink: the repository cache and
+    the store must not see each other's in-place changes of a file.
+
+    """
+    tmp = '%s.%d.tmp' % (dst, os.getpid())
+    try:
+        try:
+            _reflink(src, tmp)
+        except (IOError, OSError):
+            unlink_f(tmp)
+            shutil.copyfile(src, tmp)
+        os.rename(tmp, dst)
+    except (IOError, OSError):
+        unlink_f(tmp)
+        raise
+
+
+class PackageStore(object):
+    """Packages shared by all repositories and installroots on the host.
+
+    Files are named by the package checksum, so an identical package is
+    reused no matter which repository or installroot it comes from. The least
+    recently used files are evicted once the store grows over max_size bytes.
+
+    The total size is recorded in the store after every eviction, so that the
+    store is walked only once an added batch may have pushed it over the
+    limit. Concurrent processes can make the record stale, the next walk
+    corrects it.
+
+    """
+
+    def __init__(self, root, max_size=0):
+        self.root = root
+        self.max_size = max_size
+        self._size_path = os.path.join(root, 'size')
+        self._added = 0
+
+    def _path(self, pkg):
+        ctype, csum = pkg.returnIdSum()
+        if not ctype or not csum:
+            return None
+        return os.path.join(self.root, ctype, csum[:2], '%s.rpm' % csum)
+
+    def fetch(self, pkg):
+        """Place the stored copy of pkg at its local path, True if there was one.
+
+        The file is verified against the package checksum by the download
+        itself, which then reports it as already downloaded.
+
+        """
+        path = self._path(pkg)
+        local = pkg.localPkg()
+        if path is None or os.path.exists(local):
+            return False
+        try:
+            if os.stat(path).st_size != pkg.downloadsize:
+                return False
+            dnf.util.ensure_dir(os.path.dirname(local))
+            _clone(path, local)
+            # the mtime orders the eviction
+            os.utime(path, None)
+        except (IOError, OSError) as e:
+            if os.path.exists(path):
+                logger.debug(_('Failed to use %s from the package store: %s'), pkg, e)
+            return False
+        return True
+
+    def add(self, pkg):
+        """Store the downloaded pkg.
+
+        The caller must have verified the local file against the package
+        checksum, as the download does.
+
+        """
+        path = self._path(pkg)
+        local = pkg.localPkg()
+        if path is None or os.path.exists(path):
+            return False
+        try:
+            if os.stat(local).st_size != pkg.downloadsize:
+                return False
+            dnf.util.ensure_dir(os.path.dirname(path))
+            _clone(local, path)
+        except (IOError, OSError) as e:
+            if os.path.exists(local):
+                logger.debug(_('Failed to add %s to the package store: %s'), pkg, e)
+            return False
+        self._added += pkg.downloadsize
+        return True
+
+    def _recorded_size(self):
+        try:
+            with open(self._size_path) as f:
+                return int(f.read())
+        except (IOError, OSError, ValueError):
+            return None
+
+    def _record_size(self, total):
+        def write(tmp_path):
+            with open(tmp_path, 'w') as f:
+                f.write('%d\n' % total)
+        try:
+            dnf.persistor._replace_file(self._size_path, write)
+        except (IOError, OSError) as e:
+            logger.debug(_('Failed to record the package store size: %s'), e)
+
+    def evict(self):
+        """Remove the least recently used packages over max_size.
+
+        Call it once after adding a batch of packages.
+
+        """
+        added, self._added = self._added, 0
+        if not self.max_size or not added:
+            return
+        total = self._recorded_size()
+        if total is not None and total + added <= self.max_size:
+            self._record_size(total + added)
+            return
+        entries = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            for fn in filenames:
+                if not fn.endswith('.rpm'):
+                    continue
+                path = os.path.join(dirpath, fn)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for mtime, size, path in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+        self._record_size(total)
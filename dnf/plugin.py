@@ -21,6 +21,7 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import ast
 import fnmatch
 import glob
 import importlib
@@ -30,10 +31,12 @@ import operator
 import os
 import rpm
 import sys
+import time
 import traceback
 
 import libdnf
 import dnf.logging
+import dnf.persistor
 import dnf.pycomp
 import dnf.util
 from dnf.i18n import _
@@ -48,20 +51,16 @@ class Plugin(object):
 
     name = '<invalid>'
     config_name = None
+    # hooks and commands the plugin needs, read statically from the plugin
+    # file; when hooks are declared the plugin is imported only before one of
+    # them runs or one of the commands is requested
+    hooks = None  # :api
+    commands = ()  # :api
 
     @classmethod
     def read_config(cls, conf):
         # :api
-        parser = libdnf.conf.ConfigParser()
-        name = cls.config_name if cls.config_name else cls.name
-        files = ['%s/%s.conf' % (path, name) for path in conf.pluginconfpath]
-        for file in files:
-            if os.path.isfile(file):
-                try:
-                    parser.read(file)
-                except Exception as e:
-                    raise dnf.exceptions.ConfigError(_("Parsing file failed: %s") % str(e))
-        return parser
+        return _read_config(conf, cls.config_name if cls.config_name else cls.name)
 
     def __init__(self, base, cli):
         # :api
@@ -97,12 +96,20 @@ class Plugins(object):
     def __init__(self):
         self.plugin_cls = []
         self.plugins = []
+        self.hook_times = {}  # (plugin name, hook) -> seconds spent
+        self._deferred = []  # (plugin file, declared plugins) not imported yet
+        self._conf = None
+        self._enable_plugins = ()
+        self._init_args = None
 
     def __del__(self):
         self._unload()
 
     def _caller(self, method):
+        if self._deferred:
+            self._load_deferred(lambda declared: method in declared['hooks'])
         for plugin in self.plugins:
+            start = time.monotonic()
             try:
                 getattr(plugin, method)()
             except dnf.exceptions.Error:
@@ -111,6 +118,17 @@ class Plugins(object):
                 exc_type, exc_value, exc_traceback = sys.exc_info()
                 except_list = traceback.format_exception(exc_type, exc_value, exc_traceback)
                 logger.critical(''.join(except_list))
+            finally:
+                key = (plugin.name, method)
+                self.hook_times[key] = self.hook_times.get(key, 0.0) + time.monotonic() - start
+
+    def _report_hook_times(self):
+        """Log the time spent in hooks of each plugin, the slowest first."""
+        if not self.hook_times:
+            return
+        times = sorted(self.hook_times.items(), key=operator.itemgetter(1), reverse=True)
+        logger.debug('Plugin hook times: %s', ', '.join(
+            '%s.%s %d ms' % (name, hook, spent * 1000) for (name, hook), spent in times))
 
     def _check_enabled(self, conf, enable_plugins):
         """Checks whether plugins are enabled or disabled in configuration files
@@ -119,12 +137,7 @@ class Plugins(object):
             name = plug_cls.name
             if any(fnmatch.fnmatch(name, pattern) for pattern in enable_plugins):
                 continue
-            parser = plug_cls.read_config(conf)
-            # has it enabled = False?
-            disabled = (parser.has_section('main')
-                        and parser.has_option('main', 'enabled')
-                        and not parser.getboolean('main', 'enabled'))
-            if disabled:
+            if _config_disabled(plug_cls.read_config(conf)):
                 self.plugin_cls.remove(plug_cls)
 
     def _load(self, conf, skips, enable_plugins):
@@ -134,14 +147,61 @@ class Plugins(object):
             raise RuntimeError("load_plugins() called twice")
         sys.modules[DYNAMIC_PACKAGE] = package = dnf.pycomp.ModuleType(DYNAMIC_PACKAGE)
         package.__path__ = []
-
-        files = _get_plugins_files(conf.pluginpath, skips, enable_plugins)
-        _import_modules(package, files)
+        self._conf = conf
+        self._enable_plugins = enable_plugins
+
+        manifest = _plugins_manifest(conf)
+        files = _get_plugins_files(conf.pluginpath, skips, enable_plugins, manifest)
+        declarations = dict((fn, declared) for entry in manifest.values()
+                            for fn, fn_mtime, declared in entry['files'])
+        eager = []
+        for fn in files:
+            declared = declarations.get(fn)
+            if declared is None:
+                eager.append(fn)
+                continue
+            declared = [plugin for plugin in declared
+                        if not self._declared_disabled(conf, plugin, enable_plugins)]
+            if declared:
+                self._deferred.append((fn, declared))
+        _import_modules(package, eager)
         self.plugin_cls = _plugin_classes()[:]
         self._check_enabled(conf, enable_plugins)
         if len(self.plugin_cls) > 0:
             names = sorted(plugin.name for plugin in self.plugin_cls)
             logger.debug(_('Loaded plugins: %s'), ', '.join(names))
+        if self._deferred:
+            names = sorted(plugin['name'] for fn, declared in self._deferred for plugin in declared)
+            logger.debug(_('Deferred plugins: %s'), ', '.join(names))
+
+    @staticmethod
+    def _declared_disabled(conf, declared, enable_plugins):
+        if any(fnmatch.fnmatch(declared['name'], pattern) for pattern in enable_plugins):
+            return False
+        return _config_disabled(_read_config(conf, declared['config_name'] or declared['name']))
+
+    def _load_deferred(self, wanted):
+        """Import the deferred plugins for which wanted(declared plugin) is true."""
+        files = [fn for fn, declared in self._deferred if any(wanted(p) for p in declared)]
+        if not files:
+            return
+        self._deferred = [(fn, declared) for fn, declared in self._deferred if fn not in files]
+        package = sys.modules.get(DYNAMIC_PACKAGE)
+        if package is None:
+            # plugins were unloaded in the meantime
+            return
+        known = set(_plugin_classes())
+        _import_modules(package, files)
+        new_cls = [cls for cls in _plugin_classes() if cls not in known]
+        loaded = self.plugin_cls
+        self.plugin_cls = new_cls
+        self._check_enabled(self._conf, self._enable_plugins)
+        new_cls, self.plugin_cls = self.plugin_cls, loaded + self.plugin_cls
+        if new_cls:
+            logger.debug(_('Loaded plugins: %s'), ', '.join(sorted(cls.name for cls in new_cls)))
+        if self._init_args is not None:
+            for p_cls in new_cls:
+                self.plugins.append(p_cls(*self._init_args))
 
     def _run_pre_config(self):
         self._caller('pre_config')
@@ -153,6 +213,10 @@ class Plugins(object):
         for p_cls in self.plugin_cls:
             plugin = p_cls(base, cli)
             self.plugins.append(plugin)
+        self._init_args = (base, cli)
+        if cli is not None and self._deferred:
+            command = getattr(cli, '_requested_command', None)
+            self._load_deferred(lambda declared: _command_needed(declared, cli, command))
 
     def run_sack(self):
         self._caller('sack')
@@ -167,6 +231,7 @@ class Plugins(object):
         self._caller('transaction')
 
     def _unload(self):
+        self._deferred = []
         if DYNAMIC_PACKAGE in sys.modules:
             logger.log(dnf.logging.DDEBUG, 'Plugins were unloaded.')
             del sys.modules[DYNAMIC_PACKAGE]
@@ -200,6 +265,36 @@ class Plugins(object):
             self.plugins.remove(plugins[plugin_file])
 
 
+def _read_config(conf, name):
+    parser = libdnf.conf.ConfigParser()
+    files = ['%s/%s.conf' % (path, name) for path in conf.pluginconfpath]
+    for file in files:
+        if os.path.isfile(file):
+            try:
+                parser.read(file)
+            except Exception as e:
+                raise dnf.exceptions.ConfigError(_("Parsing file failed: %s") % str(e))
+    return parser
+
+
+def _config_disabled(parser):
+    # has it enabled = False?
+    return (parser.has_section('main')
+            and parser.has_option('main', 'enabled')
+            and not parser.getboolean('main', 'enabled'))
+
+
+def _command_needed(declared, cli, command):
+    """Whether a deferred plugin must be initialized for the requested command."""
+    if not declared['commands']:
+        return False
+    if command in declared['commands']:
+        return True
+    # help and shell can dispatch any command, an unknown one can come from
+    # any plugin
+    return command is None or command in ('help', 'shell') or command not in cli.cli_commands
+
+
 def _plugin_classes():
     return Plugin.__subclasses__()
 
@@ -217,14 +312,109 @@ def _import_modules(package, py_files):
             logger.log(dnf.logging.SUBDEBUG, '', exc_info=True)
 
 
-def _get_plugins_files(paths, disable_plugins, enable_plugins):
+def _class_base_name(node):
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return None
+
+
+def _scan_plugin_file(fn):
+    """Read the plugins declared in a plugin file without importing it.
+
+    Returns a list of the plugin classes' name, config_name, hooks and commands
+    or None when the file has to be imported to know what it provides.
+
+    """
+    try:
+        with open(fn, 'rb') as f:
+            tree = ast.parse(f.read(), fn)
+    except (IOError, OSError, SyntaxError, ValueError):
+        return None
+    declared = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.ClassDef):
+            continue
+        if node.decorator_list:
+            # e.g. register_command creates its plugin class on import
+            return None
+        if not any((_class_base_name(base) or '').endswith('Plugin') for base in node.bases):
+            continue
+        attrs = {}
+        for stmt in node.body:
+            if (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1
+                    and isinstance(stmt.targets[0], ast.Name)):
+                try:
+                    attrs[stmt.targets[0].id] = ast.literal_eval(stmt.value)
+                except (ValueError, TypeError, SyntaxError):
+                    attrs[stmt.targets[0].id] = None
+        name = attrs.get('name')
+        config_name = attrs.get('config_name')
+        hooks = attrs.get('hooks')
+        commands = attrs.get('commands', ())
+        if (not isinstance(name, dnf.pycomp.basestring)
+                or not isinstance(config_name, (dnf.pycomp.basestring, type(None)))
+                or not isinstance(hooks, (tuple, list))
+                or not isinstance(commands, (tuple, list))):
+            return None
+        declared.append({'name': name, 'config_name': config_name,
+                         'hooks': list(hooks), 'commands': list(commands)})
+    return declared or None
+
+
+def _plugins_manifest(conf):
+    """Return {plugin path: {'mtime': .., 'files': [[file, mtime, declared], ..]}}.
+
+    The listing of a plugin path is reused while the directory's mtime does not
+    change, a file is scanned again once its own mtime changes.
+
+    """
+    persistor = dnf.persistor.PluginManifestPersistor(conf.cachedir)
+    cached = persistor.load()
+    manifest = {}
+    for path in conf.pluginpath:
+        try:
+            dir_mtime = os.stat(path).st_mtime
+        except OSError:
+            continue
+        try:
+            entry = cached[path]
+            known = dict((fn, (fn_mtime, declared))
+                         for fn, fn_mtime, declared in entry['files'])
+            listed = [item[0] for item in entry['files']]
+        except (KeyError, TypeError, ValueError):
+            entry, known, listed = None, {}, []
+        if entry is None or entry.get('mtime') != dir_mtime:
+            listed = glob.glob('%s/*.py' % path)
+        files = []
+        for fn in listed:
+            try:
+                fn_mtime = os.stat(fn).st_mtime
+            except OSError:
+                continue
+            cached_mtime, declared = known.get(fn, (None, None))
+            if fn_mtime != cached_mtime:
+                declared = _scan_plugin_file(fn)
+            files.append([fn, fn_mtime, declared])
+        manifest[path] = {'mtime': dir_mtime, 'files': files}
+    if manifest != cached:
+        persistor.save(manifest)
+    return manifest
+
+
+def _get_plugins_files(paths, disable_plugins, enable_plugins, manifest=None):
     plugins = []
     disable_plugins = set(disable_plugins)
     enable_plugins = set(enable_plugins)
     pattern_enable_found = set()
     pattern_disable_found = set()
     for p in paths:
-        for fn in glob.glob('%s/*.py' % p):
+        if manifest is not None and p in manifest:
+            files = [item[0] for item in manifest[p]['files']]
+        else:
+            files = glob.glob('%s/*.py' % p)
+        for fn in files:
             (plugin_name, dummy) = os.path.splitext(os.path.basename(fn))
             matched = True
             enable_pattern_tested = False
@@ -19,11 +19,14 @@
 
 from __future__ import absolute_import
 from __future__ import unicode_literals
+import fnmatch
 import hawkey
 
 from hawkey import Query
 from dnf.i18n import ucd
 from dnf.pycomp import basestring
+import dnf.subject
+import dnf.util
 
 
 
@@ -46,3 +49,52 @@ def _per_nevra_dict(pkg_list):
     for pkg in pkg_list:
         nevra_dic.setdefault(ucd(pkg), []).append(pkg)
     return nevra_dic
+
+
+def _compile_nevra_patterns(patterns):
+    """Sort the patterns into names, name globs and the rest.
+
+    Patterns without a dot can be parsed by hawkey.Subject only as the NAME,
+    NEVR or NEV forms and the NAME form is tried first, so names and name
+    globs can be matched by a single filter each.
+    """
+    names = []
+    globs = []
+    others = []
+    for pattern in patterns:
+        if '.' in pattern:
+            others.append(pattern)
+        elif dnf.util.is_glob_pattern(pattern):
+            globs.append(pattern)
+        else:
+            names.append(pattern)
+    return tuple(names), tuple(globs), tuple(others)
+
+
+def _by_nevra_patterns(sack, patterns):
+    """Return a query matching any of the patterns.
+
+    The result is the same as the union of
+    Subject(pattern).get_best_query(sack, with_nevra=True, with_provides=False,
+    with_filenames=False) over the patterns, but it is computed with a few
+    bulk filters instead of a sack scan per pattern.
+    """
+    names, globs, others = _compile_nevra_patterns(tuple(sorted(set(patterns))))
+    query = sack.query().filterm(empty=True)
+    unresolved = list(others)
+    if names:
+        matched = sack.query().filterm(name=names)
+        found = set(pkg.name for pkg in matched)
+        # an unmatched name with a dash can still match as the NEV form
+        unresolved.extend(name for name in names if name not in found and '-' in name)
+        query = query.union(matched)
+    if globs:
+        matched = sack.query().filterm(name__glob=globs)
+        found = set(pkg.name for pkg in matched)
+        unresolved.extend(glob for glob in globs if '-' in glob and not fnmatch.filter(found, glob))
+        query = query.union(matched)
+    for pattern in unresolved:
+        subj = dnf.subject.Subject(pattern)
+        query = query.union(subj.get_best_query(
+            sack, with_nevra=True, with_provides=False, with_filenames=False))
+    return query
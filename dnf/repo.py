@@ -44,6 +44,7 @@ import re
 import shutil
 import string
 import sys
+import threading
 import time
 import traceback
 import urllib
@@ -389,30 +390,41 @@ SYNC_TRY_CACHE = libdnf.repo.Repo.SyncStrategy_TRY_CACHE
 
 
 class RepoCallbacks(libdnf.repo.RepoCB):
+    # Repositories can be loaded from several threads at once (see
+    # max_parallel_repo_loads), the progress bar and the key import prompts
+    # are shared though.
+    _lock = threading.RLock()
+
     def __init__(self, repo):
         super(RepoCallbacks, self).__init__()
         self._repo = repo
         self._md_pload = repo._md_pload
 
     def start(self, what):
-        self._md_pload.start(what)
+        with self._lock:
+            self._md_pload.start(what)
 
     def end(self):
-        self._md_pload.end()
+        with self._lock:
+            self._md_pload.end()
 
     def progress(self, totalToDownload, downloaded):
-        self._md_pload._progress_cb(None, totalToDownload, downloaded)
+        with self._lock:
+            self._md_pload._progress_cb(None, totalToDownload, downloaded)
         return 0
 
     def fastestMirror(self, stage, ptr):
-        self._md_pload._fastestmirror_cb(None, stage, ptr)
+        with self._lock:
+            self._md_pload._fastestmirror_cb(None, stage, ptr)
 
     def handleMirrorFailure(self, msg, url, metadata):
-        self._md_pload._mirror_failure_cb(None, msg, url, metadata)
+        with self._lock:
+            self._md_pload._mirror_failure_cb(None, msg, url, metadata)
         return 0
 
     def repokeyImport(self, id, userid, fingerprint, url, timestamp):
-        return self._repo._key_import._confirm(id, userid, fingerprint, url, timestamp)
+        with self._lock:
+            return self._repo._key_import._confirm(id, userid, fingerprint, url, timestamp)
 
 
 class Repo(dnf.conf.RepoConf):
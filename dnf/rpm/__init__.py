@@ -20,8 +20,11 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 from . import transaction
 from dnf.pycomp import is_py3bytes
+import concurrent.futures
 import dnf.const
 import dnf.exceptions
+import os
+import threading
 import rpm  # used by ansible (dnf.rpm.rpm.labelCompare in lib/ansible/modules/packaging/os/dnf.py)
 
 
@@ -104,9 +107,10 @@ def detect_releasever(installroot):
     return releasever
 
 
-def _header(path):
+def _header(path, ts=None):
     """Return RPM header of the file."""
-    ts = transaction.initReadOnlyTransaction()
+    if ts is None:
+        ts = transaction.initReadOnlyTransaction()
     with open(path) as package:
         fdno = package.fileno()
         try:
@@ -116,6 +120,53 @@ def _header(path):
         return hdr
 
 
+class _HeaderLoader(object):
+    """Reads headers of local package files, possibly ahead of their use.
+
+    Each reading thread sets up one read-only transaction set and reuses it
+    for all the files it reads, instead of one per file.
+
+    """
+
+    def __init__(self, jobs=None):
+        self.jobs = jobs or os.cpu_count() or 1
+        self._local = threading.local()
+        self._executor = None
+        self._pending = {}
+
+    def _read(self, path):
+        ts = getattr(self._local, 'ts', None)
+        if ts is None:
+            ts = self._local.ts = transaction.initReadOnlyTransaction()
+        return _header(path, ts)
+
+    def prefetch(self, paths):
+        """Start reading the headers of paths in the background."""
+        paths = [path for path in paths if path not in self._pending]
+        if not paths:
+            return
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs)
+        for path in paths:
+            self._pending[path] = self._executor.submit(self._read, path)
+
+    def header(self, pkg):
+        """Return the header of the local file of pkg, prefetched or read now."""
+        future = self._pending.pop(pkg.localPkg(), None)
+        if future is not None:
+            return future.result()
+        return pkg._header
+
+    def close(self):
+        if self._executor is not None:
+            for future in self._pending.values():
+                future.cancel()
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._pending.clear()
+        self._local = threading.local()
+
+
 def _invert(dct):
     return {v: k for k in dct for v in dct[k]}
 
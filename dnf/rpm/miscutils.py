@@ -14,6 +14,7 @@
 
 from __future__ import print_function, absolute_import, unicode_literals
 
+import concurrent.futures
 import os
 import subprocess
 import logging
@@ -110,3 +111,15 @@ def checkSig(ts, package):
     finally:
         os.close(fdno)
     return value
+
+def checkSigs(ts, packages, jobs=None):
+    """Check sigs of many packages like checkSig() does, running up to jobs
+    (by default the number of CPUs) rpmkeys processes at once. Return the
+    results in the order of packages."""
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(packages)))
+    if jobs == 1:
+        return [checkSig(ts, package) for package in packages]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(lambda package: checkSig(ts, package), packages))
@@ -19,14 +19,16 @@
 
 from __future__ import absolute_import
 from __future__ import unicode_literals
+import dnf.const
 import dnf.util
 import dnf.package
 import dnf.query
+import hashlib
 import logging
 import hawkey
 import os
 from dnf.pycomp import basestring
-from dnf.i18n import _
+from dnf.i18n import _, ucd
 
 logger = logging.getLogger("dnf")
 
@@ -62,6 +64,93 @@ def _build_sack(base):
                 logdebug=base.conf.logfilelevel > 9)
 
 
+def _repomd_path(repo):
+    if repo._repo.isLocal():
+        root = repo._repo.getLocalBaseurl()
+    else:
+        root = repo._repo.getCachedir()
+    return os.path.join(root, 'repodata', 'repomd.xml')
+
+
+def _snapshot_key(base, load_system_repo):
+    """Return a digest identifying everything the excludes of the sack depend on.
+
+    It covers the rpmdb cookie, the repomd.xml checksum of each enabled repo
+    and the exclude and include configuration. Returns None if some of the
+    inputs is not available.
+    """
+    conf = base.conf
+    digest = hashlib.sha256()
+
+    def update(*values):
+        for value in values:
+            digest.update(ucd(value).encode('utf-8'))
+            digest.update(b'\0')
+
+    update(dnf.const.VERSION, conf.installroot, conf.substitutions['arch'])
+    update(*sorted(conf.excludepkgs))
+    update(*sorted(conf.includepkgs))
+    update(*sorted(conf.disable_excludes))
+    if load_system_repo:
+        cookie = base._ts.dbCookie()
+        if not cookie:
+            return None
+        update(cookie)
+    for repo in sorted(base.repos.iter_enabled()):
+        try:
+            with open(_repomd_path(repo), 'rb') as f:
+                repomd_checksum = hashlib.sha256(f.read()).hexdigest()
+        except (IOError, OSError):
+            return None
+        update(repo.id, repomd_checksum)
+        update(*sorted(repo.excludepkgs))
+        update(*sorted(repo.includepkgs))
+    return digest.hexdigest()
+
+
+def _nevras_by_repo(query):
+    """Return {reponame: [nevra, ...]} of the packages in query."""
+    nevras = {}
+    for pkg in query:
+        nevras.setdefault(pkg.reponame, []).append(
+            '%s-%d:%s-%s.%s' % (pkg.name, pkg.epoch, pkg.version, pkg.release, pkg.arch))
+    return nevras
+
+
+def _query_by_nevras(query, nevras_by_repo):
+    """Return the packages of query listed in the result of _nevras_by_repo()."""
+    result = query.filter(empty=True)
+    for reponame, nevras in nevras_by_repo.items():
+        result = result.union(query.filter(reponame=reponame, nevra_strict=nevras))
+    return result
+
+
+def _excludes_snapshot(excludes, includes):
+    """Capture the evaluated exclude and include queries in a JSON-serializable form.
+
+    The arguments are the result of Base._evaluate_excludes_includes().
+    """
+    excluded = {}
+    for query in excludes:
+        for reponame, nevras in _nevras_by_repo(query).items():
+            excluded.setdefault(reponame, []).extend(nevras)
+    return {
+        'excludes': excluded,
+        'includes': [[repoid, _nevras_by_repo(query)] for query, repoid in includes],
+    }
+
+
+def _snapshot_queries(sack, snapshot):
+    """Rebuild the exclude and include queries captured by _excludes_snapshot()."""
+    query = sack.query(flags=hawkey.IGNORE_EXCLUDES)
+    excludes = []
+    if snapshot['excludes']:
+        excludes.append(_query_by_nevras(query, snapshot['excludes']))
+    includes = [(_query_by_nevras(query, nevras), repoid)
+                for repoid, nevras in snapshot['includes']]
+    return excludes, includes
+
+
 def _rpmdb_sack(base):
     # used by subscription-manager (src/dnf-plugins/product-id.py)
     sack = _build_sack(base)
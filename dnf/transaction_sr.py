@@ -219,6 +219,14 @@ class TransactionReplay(object):
         self._nevra_reason_cache = {}
         self._warnings = []
 
+        # NEVRA string -> parsed NEVRA, NEVRA -> installed and available
+        # packages and (name, arch) -> installed packages, see _index_rpms()
+        self._parsed_nevras = {}
+        self._installed_pkgs = {}
+        self._available_pkgs = {}
+        self._installed_na_pkgs = {}
+        self._indexed_names = set()
+
         if filename and data:
             raise ValueError(_("Conflicting TransactionReplay arguments have been specified: filename, data"))
         elif filename:
@@ -289,34 +297,14 @@ class TransactionReplay(object):
                     .format(reason=pkg_data["reason"], nevra=nevra)
             )
 
-        subj = hawkey.Subject(nevra)
-        parsed_nevras = subj.get_nevra_possibilities(forms=[hawkey.FORM_NEVRA])
-
-        if len(parsed_nevras) != 1:
+        parsed_nevra = self._parse_nevra(nevra)
+        if parsed_nevra is None:
             raise TransactionError(_('Cannot parse NEVRA for package "{nevra}".').format(nevra=nevra))
 
-        parsed_nevra = parsed_nevras[0]
         na = "%s.%s" % (parsed_nevra.name, parsed_nevra.arch)
+        pkgs = self._resolve_pkg(parsed_nevra, repo_id)
 
-        query_na = self._base.sack.query().filter(name=parsed_nevra.name, arch=parsed_nevra.arch)
-
-        epoch = parsed_nevra.epoch if parsed_nevra.epoch is not None else 0
-        query = query_na.filter(epoch=epoch, version=parsed_nevra.version, release=parsed_nevra.release)
-
-        # In case the package is found in the same repo as in the original
-        # transaction, limit the query to that plus installed packages. IOW
-        # remove packages with the same NEVRA in case they are found in
-        # multiple repos and the repo the package came from originally is one
-        # of them.
-        # This can e.g. make a difference in the system-upgrade plugin, in case
-        # the same NEVRA is in two repos, this makes sure the same repo is used
-        # for both download and upgrade steps of the plugin.
-        if repo_id:
-            query_repo = query.filter(reponame=repo_id)
-            if query_repo:
-                query = query_repo.union(query.installed())
-
-        if not query:
+        if not pkgs:
             self._raise_or_warn(self._skip_unavailable, _('Cannot find rpm nevra "{nevra}".').format(nevra=nevra))
             return
 
@@ -330,27 +318,29 @@ class TransactionReplay(object):
             self._nevra_reason_cache[nevra] = reason
 
         if action in ("Install", "Upgrade", "Downgrade"):
-            if action == "Install" and query_na.installed() and not self._base._get_installonly_query(query_na):
+            installed_na = self._installed_na_pkgs.get((parsed_nevra.name, parsed_nevra.arch))
+            if action == "Install" and installed_na and not self._base._get_installonly_query(
+                    self._base.sack.query().filterm(pkg=installed_na)):
                 self._raise_or_warn(self._ignore_installed,
                     _('Package "{na}" is already installed for action "{action}".').format(na=na, action=action))
 
-            sltr = dnf.selector.Selector(self._base.sack).set(pkg=query)
+            sltr = dnf.selector.Selector(self._base.sack).set(pkg=self._base.sack.query().filterm(pkg=pkgs))
             self._base.goal.install(select=sltr, optional=not self._base.conf.strict)
         elif action == "Reinstall":
-            query = query.available()
+            pkgs = [pkg for pkg in pkgs if not pkg._from_system]
 
-            if not query:
+            if not pkgs:
                 self._raise_or_warn(self._skip_unavailable,
                     _('Package nevra "{nevra}" not available in repositories for action "{action}".')
                     .format(nevra=nevra, action=action))
                 return
 
-            sltr = dnf.selector.Selector(self._base.sack).set(pkg=query)
+            sltr = dnf.selector.Selector(self._base.sack).set(pkg=self._base.sack.query().filterm(pkg=pkgs))
             self._base.goal.install(select=sltr, optional=not self._base.conf.strict)
         elif action in ("Upgraded", "Downgraded", "Reinstalled", "Removed", "Obsoleted"):
-            query = query.installed()
+            pkgs = [pkg for pkg in pkgs if pkg._from_system]
 
-            if not query:
+            if not pkgs:
                 self._raise_or_warn(self._ignore_installed,
                     _('Package nevra "{nevra}" not installed for action "{action}".').format(nevra=nevra, action=action))
                 return
@@ -360,16 +350,74 @@ class TransactionReplay(object):
             # skip_unavailable is True, because if the forward part of the
             # action is skipped, we would simply remove the package here
             if not self._skip_unavailable or action == "Removed":
-                for pkg in query:
+                for pkg in pkgs:
                     self._base.goal.erase(pkg, clean_deps=False)
         elif action == "Reason Change":
-            self._base.history.set_reason(query[0], reason)
+            self._base.history.set_reason(pkgs[0], reason)
         else:
             raise TransactionError(
                 _('Unexpected value of package action "{action}" for rpm nevra "{nevra}".')
                     .format(action=action, nevra=nevra)
             )
 
+    def _parse_nevra(self, nevra):
+        """Return the parsed NEVRA or None if it can't be parsed."""
+        if nevra not in self._parsed_nevras:
+            parsed_nevras = hawkey.Subject(nevra).get_nevra_possibilities(forms=[hawkey.FORM_NEVRA])
+            self._parsed_nevras[nevra] = parsed_nevras[0] if len(parsed_nevras) == 1 else None
+        return self._parsed_nevras[nevra]
+
+    def _index_rpms(self):
+        """Parse NEVRAs of all rpms in the transaction and index the packages
+        with their names by NEVRA, querying the sack only once."""
+        names = set()
+        for pkg_data in self._rpms:
+            nevra = pkg_data.get("nevra") if isinstance(pkg_data, dict) else None
+            if not isinstance(nevra, str):
+                continue
+            parsed_nevra = self._parse_nevra(nevra)
+            if parsed_nevra is not None:
+                names.add(parsed_nevra.name)
+        self._index_names(names)
+
+    def _index_names(self, names):
+        names = set(names) - self._indexed_names
+        if not names:
+            return
+        for pkg in self._base.sack.query().filterm(name=list(names)):
+            key = (pkg.name, pkg.epoch, pkg.version, pkg.release, pkg.arch)
+            if pkg._from_system:
+                self._installed_pkgs.setdefault(key, []).append(pkg)
+                self._installed_na_pkgs.setdefault((pkg.name, pkg.arch), []).append(pkg)
+            else:
+                self._available_pkgs.setdefault(key, []).append(pkg)
+        self._indexed_names.update(names)
+
+    def _resolve_pkg(self, parsed_nevra, repo_id):
+        """Return the list of installed and available packages matching the
+        NEVRA."""
+        self._index_names([parsed_nevra.name])
+        epoch = parsed_nevra.epoch if parsed_nevra.epoch is not None else 0
+        key = (parsed_nevra.name, epoch, parsed_nevra.version, parsed_nevra.release,
+               parsed_nevra.arch)
+        installed = self._installed_pkgs.get(key, [])
+        available = self._available_pkgs.get(key, [])
+
+        # In case the package is found in the same repo as in the original
+        # transaction, limit the packages to that plus installed packages. IOW
+        # remove packages with the same NEVRA in case they are found in
+        # multiple repos and the repo the package came from originally is one
+        # of them.
+        # This can e.g. make a difference in the system-upgrade plugin, in case
+        # the same NEVRA is in two repos, this makes sure the same repo is used
+        # for both download and upgrade steps of the plugin.
+        if repo_id:
+            repo_pkgs = [pkg for pkg in available if pkg.reponame == repo_id]
+            if repo_pkgs:
+                available = repo_pkgs
+
+        return installed + available
+
     def _create_swdb_group(self, group_id, pkg_types, pkgs):
         comps_group = self._base.comps._group_by_id(group_id)
         if not comps_group:
@@ -533,6 +581,7 @@ class TransactionReplay(object):
         fn = self._filename
         errors = []
 
+        self._index_rpms()
         for pkg_data in self._rpms:
             try:
                 self._replay_pkg_action(pkg_data)
@@ -429,15 +429,40 @@ def _te_nevra(te):
     return nevra + te.V() + '-' + te.R() + '.' + te.A()
 
 
-def _log_rpm_trans_with_swdb(rpm_transaction, swdb_transaction):
+def _swdb_items_by_nevra(swdb_transaction):
+    """Return the items to be reverted by the transaction, listed by NEVRA.
+
+    RPM elements of these items may lack the item as their Key().
+
+    """
+    revert_actions = {libdnf.transaction.TransactionItemAction_DOWNGRADED,
+                      libdnf.transaction.TransactionItemAction_OBSOLETED,
+                      libdnf.transaction.TransactionItemAction_REMOVE,
+                      libdnf.transaction.TransactionItemAction_UPGRADED,
+                      libdnf.transaction.TransactionItemAction_REINSTALLED}
+    result = {}
+    for tsi in swdb_transaction:
+        if tsi.action in revert_actions:
+            result.setdefault(str(tsi), []).append(tsi)
+    return result
+
+
+def _log_rpm_trans_with_swdb(rpm_transaction, swdb_transaction, tsi_by_nevra=None):
     logger.debug("Logging transaction elements")
+    if tsi_by_nevra is None:
+        tsi_by_nevra = _swdb_items_by_nevra(swdb_transaction)
     for rpm_el in rpm_transaction:
+        te_nevra = _te_nevra(rpm_el)
         tsi = rpm_el.Key()
         tsi_state = None
         if tsi is not None:
             tsi_state = tsi.state
         msg = "RPM element: '{}', Key(): '{}', Key state: '{}', Failed() '{}': ".format(
-            _te_nevra(rpm_el), tsi, tsi_state, rpm_el.Failed())
+            te_nevra, tsi, tsi_state, rpm_el.Failed())
+        if tsi is None:
+            msg += "SWDB elements of the NEVRA: '{}'".format(
+                ["{} ({})".format(candidate.action, candidate.state)
+                 for candidate in tsi_by_nevra.get(te_nevra, [])])
         logger.debug(msg)
     for tsi in swdb_transaction:
         msg = "SWDB element: '{}', State: '{}', Action: '{}', From repo: '{}', Reason: '{}', " \
@@ -447,24 +472,16 @@ def _log_rpm_trans_with_swdb(rpm_transaction, swdb_transaction):
 
 
 def _sync_rpm_trans_with_swdb(rpm_transaction, swdb_transaction):
-    revert_actions = {libdnf.transaction.TransactionItemAction_DOWNGRADED,
-                      libdnf.transaction.TransactionItemAction_OBSOLETED,
-                      libdnf.transaction.TransactionItemAction_REMOVE,
-                      libdnf.transaction.TransactionItemAction_UPGRADED,
-                      libdnf.transaction.TransactionItemAction_REINSTALLED}
     cached_tsi = [tsi for tsi in swdb_transaction]
+    tsi_by_nevra = _swdb_items_by_nevra(cached_tsi)
     el_not_found = False
     error = False
     for rpm_el in rpm_transaction:
         te_nevra = _te_nevra(rpm_el)
         tsi = rpm_el.Key()
         if tsi is None or not hasattr(tsi, "pkg"):
-            for tsi_candidate in cached_tsi:
-                if tsi_candidate.state != libdnf.transaction.TransactionItemState_UNKNOWN:
-                    continue
-                if tsi_candidate.action not in revert_actions:
-                    continue
-                if str(tsi_candidate) == te_nevra:
+            for tsi_candidate in tsi_by_nevra.get(te_nevra, []):
+                if tsi_candidate.state == libdnf.transaction.TransactionItemState_UNKNOWN:
                     tsi = tsi_candidate
                     break
         if tsi is None or not hasattr(tsi, "pkg"):
@@ -483,7 +500,7 @@ def _sync_rpm_trans_with_swdb(rpm_transaction, swdb_transaction):
     if error:
         logger.debug(_('Errors occurred during transaction.'))
     if el_not_found:
-        _log_rpm_trans_with_swdb(rpm_transaction, cached_tsi)
+        _log_rpm_trans_with_swdb(rpm_transaction, cached_tsi, tsi_by_nevra)
 
 
 class tmpdir(object):
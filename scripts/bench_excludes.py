@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+# Measure the sack setup time depending on the number of exclude patterns.
+#
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, see
+# <https://www.gnu.org/licenses/>.  Any Red Hat trademarks that are
+# incorporated in the source code or documentation are not subject to the GNU
+# General Public License and may only be used or replicated with the express
+# permission of Red Hat, Inc.
+#
+# Usage: bench_excludes.py [COUNT...]
+#
+# Loads the system repositories from the cache and for each COUNT takes that
+# many exclude patterns (a mix of names, name globs and NEVRAs built from the
+# available packages) and reports how long it takes to resolve them pattern
+# by pattern and with dnf.query._by_nevra_patterns().
+
+from __future__ import print_function
+
+import sys
+import time
+
+import dnf
+import dnf.query
+import dnf.subject
+import hawkey
+
+
+def per_pattern(sack, patterns):
+    query = sack.query().filterm(empty=True)
+    for pattern in set(patterns):
+        subj = dnf.subject.Subject(pattern)
+        query = query.union(subj.get_best_query(
+            sack, with_nevra=True, with_provides=False, with_filenames=False))
+    return query
+
+
+def make_patterns(pkgs, count):
+    patterns = []
+    for i, pkg in enumerate(pkgs[:count]):
+        if i % 3 == 0:
+            patterns.append(pkg.name)
+        elif i % 3 == 1:
+            patterns.append(pkg.name[:-1] + '*')
+        else:
+            patterns.append(str(pkg))
+    return patterns
+
+
+def measure(fn, *args):
+    start = time.time()
+    result = len(fn(*args))
+    return time.time() - start, result
+
+
+def main(counts):
+    with dnf.Base() as base:
+        base.read_all_repos()
+        base.fill_sack_from_repos_in_cache(load_system_repo=False)
+        pkgs = base.sack.query(flags=hawkey.IGNORE_EXCLUDES).latest().run()
+        print('%8s %12s %12s %8s' % ('patterns', 'per-pattern', 'bulk', 'matched'))
+        for count in counts:
+            patterns = make_patterns(pkgs, count)
+            old_time, old_len = measure(per_pattern, base.sack, patterns)
+            new_time, new_len = measure(dnf.query._by_nevra_patterns, base.sack, patterns)
+            assert old_len == new_len
+            print('%8d %11.3fs %11.3fs %8d' % (len(patterns), old_time, new_time, new_len))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10, 100, 500, 1000])
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+# Measure the cost of writing log records to the DNF log file.
+#
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, see
+# <https://www.gnu.org/licenses/>.  Any Red Hat trademarks that are
+# incorporated in the source code or documentation are not subject to the GNU
+# General Public License and may only be used or replicated with the express
+# permission of Red Hat, Inc.
+#
+# Usage: bench_logging.py [COUNT...]
+#
+# For each COUNT writes that many DEBUG records into a temporary log file,
+# once with logging.handlers.RotatingFileHandler, which writes and checks
+# the size for every record, and once with the batching
+# dnf.logging.MultiprocessRotatingFileHandler.
+
+from __future__ import print_function
+
+import logging
+import logging.handlers
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import dnf.logging
+
+
+def measure(cls, logfile, records):
+    handler = cls(logfile, maxBytes=1024 * 1024 * 1024, backupCount=1)
+    start = time.time()
+    for record in records:
+        handler.handle(record)
+    handler.flush()
+    elapsed = time.time() - start
+    handler.close()
+    with open(logfile) as f:
+        written = len(f.read().splitlines())
+    os.unlink(logfile)
+    return elapsed, written
+
+
+def main(counts):
+    logdir = tempfile.mkdtemp(prefix='dnf-bench-logging-')
+    logfile = os.path.join(logdir, 'dnf.log')
+    try:
+        print('%8s %12s %12s' % ('records', 'per-record', 'batched'))
+        for count in counts:
+            records = [logging.makeLogRecord({'msg': 'scriptlet output line %d' % i,
+                                              'levelno': logging.DEBUG,
+                                              'levelname': 'DEBUG'})
+                       for i in range(count)]
+            old_time, old_len = measure(logging.handlers.RotatingFileHandler, logfile, records)
+            new_time, new_len = measure(dnf.logging.MultiprocessRotatingFileHandler, logfile,
+                                        records)
+            assert old_len == new_len == count
+            print('%8d %11.3fs %11.3fs' % (count, old_time, new_time))
+    finally:
+        shutil.rmtree(logdir)
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
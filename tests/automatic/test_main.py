@@ -19,9 +19,15 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import socket
+import tempfile
+
 import dnf.automatic.main
+import dnf.persistor
+import dnf.util
 
 import tests.support
+from tests.support import mock
 
 
 FILE = tests.support.resource_path('etc/automatic.conf')
@@ -52,3 +58,36 @@ class TestConfig(tests.support.TestCase):
         # test that reboot is "never" by default
         conf = dnf.automatic.main.AutomaticConfig(FILE)
         self.assertEqual(conf.commands.reboot, 'never')
+
+
+class TestWaitForNetwork(tests.support.TestCase):
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp(prefix="dnf_test_automatic_")
+        repo = mock.Mock(proxy='', mirrorlist='', metalink='',
+                         baseurl=['http://down.example.com/repo', 'https://up.example.com/repo'])
+        self.repos = mock.Mock()
+        self.repos.iter_enabled.return_value = [repo]
+
+    def tearDown(self):
+        dnf.util.rm_rf(self.cachedir)
+
+    @staticmethod
+    def _connect(address, timeout):
+        if address[0] == 'down.example.com':
+            raise socket.timeout()
+        return mock.Mock()
+
+    def test_first_reachable(self):
+        with mock.patch('socket.create_connection', side_effect=self._connect):
+            self.assertTrue(dnf.automatic.main.wait_for_network(self.repos, 5, self.cachedir))
+        reached = dnf.persistor.ReachabilityPersistor(self.cachedir).load()
+        self.assertCountEqual(reached, ['up.example.com:443'])
+
+    def test_unreachable(self):
+        with mock.patch('socket.create_connection', side_effect=socket.error()):
+            self.assertFalse(dnf.automatic.main.wait_for_network(self.repos, 0.5, self.cachedir))
+        self.assertEqual(dnf.persistor.ReachabilityPersistor(self.cachedir).load(), {})
+
+    def test_no_remote_repos(self):
+        self.repos.iter_enabled.return_value = []
+        self.assertTrue(dnf.automatic.main.wait_for_network(self.repos, 5))
@@ -297,3 +297,29 @@ class UpdateInfoCommandTest(tests.support.DnfBaseTestCase):
                          '    Updated: ' + str(updated) + '\n'
                          'Description: testing advisory\n',
                          'incorrect output')
+
+
+class NewerEqualInstalledTest(tests.support.TestCase):
+
+    def test_installed_evr_index(self):
+        installed = []
+        for name, evr in (('tour', '4.6-1'), ('tour', '5-0'), ('lotus', '3-16')):
+            pkg = mock.Mock(evr=evr)
+            pkg.name = name
+            installed.append(pkg)
+        cli = mock.Mock()
+        cli.base.sack.query.return_value.installed.return_value = installed
+        cli.base.sack.evr_cmp.side_effect = lambda a, b: (a > b) - (a < b)
+        cmd = dnf.cli.commands.updateinfo.UpdateInfoCommand(cli)
+
+        def apkg(name, evr):
+            apackage = mock.Mock(evr=evr)
+            apackage.name = name
+            return apackage
+
+        self.assertTrue(cmd._newer_equal_installed(apkg('tour', '5-0')))
+        self.assertTrue(cmd._newer_equal_installed(apkg('tour', '5-0')))
+        self.assertFalse(cmd._newer_equal_installed(apkg('lotus', '4-0')))
+        self.assertFalse(cmd._newer_equal_installed(apkg('pepper', '1-0')))
+        cli.base.sack.query.assert_called_once_with()
+        self.assertEqual(cli.base.sack.evr_cmp.call_count, 3)
@@ -30,6 +30,7 @@ import libdnf.transaction
 import rpm
 
 import dnf
+import dnf.db.history
 import dnf.exceptions
 import dnf.package
 import dnf.subject
@@ -82,6 +83,40 @@ class BaseTest(tests.support.TestCase):
         self.assertIsNotNone(reg.match(base.conf.cachedir))
         base.close()
 
+    def test_load_repos_metadata(self):
+        base = tests.support.MockBase()
+        base.conf.max_parallel_repo_loads = 4
+        good = mock.Mock()
+        bad = mock.Mock()
+        error = dnf.exceptions.RepoError('Cannot download repomd.xml')
+        bad.load.side_effect = error
+        errors = base._load_repos_metadata([good, bad])
+        good.load.assert_called_once_with()
+        bad.load.assert_called_once_with()
+        self.assertEqual(errors, {bad: error})
+        base.close()
+
+    @mock.patch('dnf.rpm.transaction.initReadOnlyTransaction')
+    @mock.patch('dnf.rpm.miscutils.checkSigs', return_value=[1, 0])
+    def test_sig_check_pkgs(self, check_sigs, init_ts):
+        base = tests.support.MockBase()
+        base.repos.add(tests.support.MockRepo('signed', base.conf))
+        base.repos['signed'].gpgcheck = True
+        base.repos['signed'].gpgkey = ['file:///etc/pki/key']
+        base.repos.add(tests.support.MockRepo('unsigned', base.conf))
+        base.repos['unsigned'].gpgcheck = False
+        pkgs = []
+        for repoid, location in (('signed', '/c/a.rpm'), ('unsigned', '/c/b.rpm'),
+                                 ('signed', '/c/c.rpm')):
+            pkg = mock.Mock(repoid=repoid, _from_cmdline=False)
+            pkg.localPkg.return_value = location
+            pkgs.append(pkg)
+        self.assertEqual(base._sig_check_pkgs(pkgs),
+                         [(1, 'Public key for a.rpm is not installed'), (0, ''), (0, '')])
+        check_sigs.assert_called_once_with(init_ts.return_value, ['/c/a.rpm', '/c/c.rpm'])
+        init_ts.assert_called_once_with(base.conf.installroot)
+        base.close()
+
     def test_reset(self):
         base = tests.support.MockBase('main')
         base.reset(sack=True, repos=False)
@@ -116,6 +151,8 @@ class BaseTest(tests.support.TestCase):
         # reason and repo are set in _setup_packages() already
         self.assertEqual(base.history.user_installed(pkg), True)
         self.assertEqual(base.history.repo(pkg), 'main')
+        self.assertEqual(base.history.repos([pkg]), {pkg: 'main'})
+        self.assertIn(pkg, list(base.iter_userinstalled()))
         base.close()
 
     def test_iter_userinstalled_badfromrepo(self):
@@ -160,6 +197,9 @@ class BaseTest(tests.support.TestCase):
         pkg, = base.sack.query().installed().filter(name='pepper')
         self.assertEqual(base.history.user_installed(pkg), False)
         self.assertEqual(base.history.repo(pkg), 'main')
+        self.assertEqual(base.history.reasons([pkg]),
+                         {pkg: libdnf.transaction.TransactionItemReason_DEPENDENCY})
+        self.assertEqual(base.history.filter_user_installed([pkg]), [])
         base.close()
 
 
@@ -251,6 +291,69 @@ class InstallReasonTest(tests.support.ResultTestCase):
         )
 
 
+class RPMTransactionItemsTest(tests.support.TestCase):
+
+    def setUp(self):
+        self.base = tests.support.MockBase()
+        self.base._sack = tests.support.mock_sack('main')
+
+    def tearDown(self):
+        self.base.close()
+
+    def test_items_cache(self):
+        trans = self.base.history.rpm
+        new_pkg = tests.support.MockPackage('pepper-20-0.x86_64')
+        old_pkg = tests.support.MockPackage('pepper-19-0.x86_64')
+        trans.add_install(new_pkg)
+        self.assertLength(trans, 1)
+        self.assertEqual(trans.install_set, {new_pkg})
+        self.assertEqual(trans.remove_set, set())
+
+        # the returned sets are not the cached ones
+        trans.install_set.add(old_pkg)
+        self.assertEqual(trans.install_set, {new_pkg})
+
+        trans.add_remove(old_pkg)
+        self.assertLength(trans, 2)
+        self.assertEqual(trans.remove_set, {old_pkg})
+        self.assertEqual([tsi.pkg for tsi in trans._get_items(dnf.transaction.PKG_ERASE)],
+                         [old_pkg])
+
+    def test_action_change_invalidates_owner(self):
+        trans = self.base.history.rpm
+        trans.add_install(tests.support.MockPackage('pepper-20-0.x86_64'))
+        tsi = list(trans)[0]
+        self.assertIs(tsi._owner, trans)
+        tsi.action = dnf.transaction.PKG_REINSTALL
+        self.assertEqual(trans._get_items(dnf.transaction.PKG_INSTALL), [])
+        self.assertLength(trans._get_items(dnf.transaction.PKG_REINSTALL), 1)
+
+    def test_action_change_of_historic_item(self):
+        history = self.base.history
+        wrapper = dnf.db.history.TransactionWrapper(mock.Mock())
+        tsi = dnf.db.history.RPMTransactionItemWrapper(wrapper, mock.Mock())
+        with mock.patch.object(type(history), 'rpm', new_callable=mock.PropertyMock) as rpm:
+            tsi.action = dnf.transaction.PKG_REINSTALL
+        rpm.assert_not_called()
+        tsi._item.setAction.assert_called_once_with(dnf.transaction.PKG_REINSTALL)
+
+
+class Goal2TransactionReasonsTest(tests.support.ResultTestCase):
+
+    REPOS = ["main"]
+
+    def test_reasons_read_at_once(self):
+        self.base.install("mrkite")
+        self.base.remove("pepper")
+        with mock.patch('dnf.db.group.RPMTransaction.get_reason') as get_reason, \
+                mock.patch.object(self.base.history, 'reasons',
+                                  wraps=self.base.history.reasons) as reasons:
+            self.base.resolve(allow_erasing=True)
+        get_reason.assert_not_called()
+        reasons.assert_called_once()
+        self.assertLength(self.base._transaction._get_items(dnf.transaction.PKG_ERASE), 1)
+
+
 class InstalledMatchingTest(tests.support.ResultTestCase):
 
     REPOS = ["main"]
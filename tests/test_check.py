@@ -24,6 +24,7 @@ import dnf.cli.commands.check
 import dnf.pycomp
 
 import tests.support
+from tests.support import mock
 
 
 EXPECTED_DUPLICATES_FORMAT = """\
@@ -61,3 +62,51 @@ class CheckDuplicatesTest(tests.support.DnfBaseTestCase):
             self.assertEqual(str(ctx.exception),
                              'Check discovered 1 problem(s)')
         self.assertEqual(stdout.getvalue(), EXPECTED_OBSOLETED_FORMAT)
+
+
+class InstalledIndexTest(tests.support.TestCase):
+
+    def setUp(self):
+        self.pkg = mock.Mock(provides=['lotus', 'lotus = 3-16'])
+        self.pkg.name = 'lotus'
+        self.query = mock.MagicMock()
+        self.query.__iter__ = mock.Mock(side_effect=lambda: iter([self.pkg]))
+        self.query._name_dict.return_value = {'lotus': [self.pkg]}
+        self.query.filter.return_value = [self.pkg]
+        self.index = dnf.cli.commands.check._InstalledIndex(self.query, mock.Mock())
+
+    def test_satisfied_by_name(self):
+        self.assertTrue(self.index.satisfied('lotus'))
+        self.assertFalse(self.index.satisfied('tour >= 1'))
+        self.query.filter.assert_not_called()
+
+    def test_providers_cached(self):
+        self.assertTrue(self.index.satisfied('/usr/bin/lotus'))
+        self.assertTrue(self.index.satisfied('/usr/bin/lotus'))
+        self.assertEqual(self.index.providers('/usr/bin/lotus'), {self.pkg})
+        self.query.filter.assert_called_once_with(provides=['/usr/bin/lotus'])
+
+    def test_named_providers(self):
+        self.assertEqual(self.index.named_providers('lotus < 4'), [self.pkg])
+        self.assertEqual(self.index.named_providers('tour < 4'), [])
+        self.query.filter.assert_called_once_with(provides=['lotus < 4'])
+
+
+class InstalledIndexSackTest(tests.support.DnfBaseTestCase):
+
+    REPOS = []
+
+    def test_same_as_query(self):
+        query = self.sack.query().installed()
+        index = dnf.cli.commands.check._InstalledIndex(query, self.sack.evr_cmp)
+        deps = set()
+        for pkg in query:
+            deps.update(str(require) for require in pkg.requires)
+            for evr in ('0', '1', '1-0', '1-1', '1-2', '2', '20', '20-0', '20-1', '21',
+                        '1:1', '0:20-0', '5-0', '3'):
+                for op in ('=', '<', '>', '<=', '>='):
+                    deps.add('%s %s %s' % (pkg.name, op, evr))
+        deps.update(['parking', 'parking >= 1', '/raised/smile', 'nosuchthing',
+                     'nosuchthing > 1'])
+        for dep in sorted(deps):
+            self.assertEqual(index.satisfied(dep), bool(query.filter(provides=[dep])), dep)
@@ -20,11 +20,17 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 
 import argparse
+import importlib
 import os
 import re
+import subprocess
+import sys
+import unittest
 from argparse import Namespace
 
 import dnf.cli.cli
+import dnf.cli.commands.check
+import dnf.cli.option_parser
 import dnf.conf
 import dnf.goal
 import dnf.repo
@@ -97,6 +103,103 @@ class BaseCliTest(tests.support.ResultTestCase):
         self.assertEqual(self.base.downgrade_to.mock_calls, [mock.call('lotus', strict=False)])
 
 
+class CommandRegistryTest(tests.support.TestCase):
+
+    def test_aliases_from_command_class(self):
+        registry = dnf.cli.cli._CommandRegistry()
+        registry.add_lazy(dnf.cli.cli._LazyCommand('history', 'HistoryCommand'))
+        self.assertNotIn('history', dict.keys(registry))
+
+        command_cls = registry.get('hist')
+        self.assertEqual(command_cls.__name__, 'HistoryCommand')
+        self.assertEqual(sorted(dict.keys(registry)), sorted(command_cls.aliases))
+        self.assertIs(registry['history'], command_cls)
+        self.assertIsNone(registry.get('nosuchcommand'))
+        with self.assertRaises(KeyError):
+            registry['nosuchcommand']
+
+    def test_lookup_imports_matching_module_first(self):
+        registry = dnf.cli.cli._CommandRegistry()
+        for module, cls_name, aliases in dnf.cli.cli._BUILTIN_COMMANDS:
+            registry.add_lazy(dnf.cli.cli._LazyCommand(module, cls_name, aliases))
+        self.assertIn('dsync', registry)
+        self.assertEqual([c.__name__ for c in set(dict.values(registry))],
+                         ['DistroSyncCommand'])
+
+        # every built-in is registered under all of its aliases
+        for module, cls_name, aliases in dnf.cli.cli._BUILTIN_COMMANDS:
+            command_cls = getattr(importlib.import_module('dnf.cli.commands.%s' % module),
+                                  cls_name)
+            for name in command_cls.aliases:
+                self.assertIs(registry[name], command_cls)
+        self.assertEqual(registry._lazy, [])
+
+    def test_declared_aliases_match_classes(self):
+        for module, cls_name, aliases in dnf.cli.cli._BUILTIN_COMMANDS:
+            command_cls = getattr(importlib.import_module('dnf.cli.commands.%s' % module),
+                                  cls_name)
+            self.assertEqual(list(aliases), list(command_cls.aliases), cls_name)
+
+    def test_alias_clash_with_lazy_builtin(self):
+        registry = dnf.cli.cli._CommandRegistry()
+        for module, cls_name, aliases in dnf.cli.cli._BUILTIN_COMMANDS:
+            registry.add_lazy(dnf.cli.cli._LazyCommand(module, cls_name, aliases))
+
+        class UpdateCommand(dnf.cli.commands.Command):
+            aliases = ('plugin-update', 'update')
+
+        with self.assertRaises(dnf.exceptions.ConfigError):
+            registry.add(UpdateCommand)
+        self.assertEqual(len(registry._lazy), len(dnf.cli.cli._BUILTIN_COMMANDS))
+
+    def test_usage_loads_summaries(self):
+        registry = dnf.cli.cli._CommandRegistry()
+        registry.add_lazy(dnf.cli.cli._LazyCommand('check', 'CheckCommand'))
+        parser = dnf.cli.option_parser.OptionParser()
+        parser.add_commands(registry, 'main')
+        self.assertEqual(parser._cmd_groups, set(['main']))
+        self.assertEqual(parser._cmd_usage, {})
+
+        self.assertIn(dnf.cli.commands.check.CheckCommand.summary, parser.get_usage())
+        self.assertIn('check', parser._cmd_usage)
+
+    def test_submodule_attribute(self):
+        self.assertIs(dnf.cli.commands.check, sys.modules['dnf.cli.commands.check'])
+        with self.assertRaises(AttributeError):
+            dnf.cli.commands.nosuchmodule
+
+
+class CliImportTest(tests.support.TestCase):
+
+    @unittest.skipIf(sys.version_info < (3, 7), "-X importtime needs Python 3.7")
+    def test_main_imports_no_command_module(self):
+        topdir = os.path.dirname(os.path.dirname(os.path.abspath(dnf.__file__)))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [topdir, env.get('PYTHONPATH')]))
+        proc = subprocess.Popen([sys.executable, '-X', 'importtime', '-c', 'import dnf.cli.main'],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+        _, err = proc.communicate()
+        self.assertEqual(proc.returncode, 0, err)
+
+        # "import time: self [us] | cumulative | imported package"
+        cumulative = {}
+        for line in err.decode('utf-8').splitlines():
+            fields = line.split('|')
+            if not line.startswith('import time:') or len(fields) != 3:
+                continue
+            try:
+                cumulative[fields[2].strip()] = int(fields[1])
+            except ValueError:
+                continue
+        self.assertIn('dnf.cli.main', cumulative)
+        commands = [name for name in cumulative if name.startswith('dnf.cli.commands.')]
+        self.assertEqual(commands, [])
+
+        # timings are too noisy on loaded builders to be always checked
+        if os.environ.get("DNF_BENCHMARK"):
+            print("\nimport dnf.cli.main: %.1fms" % (cumulative['dnf.cli.main'] / 1000.0))
+
+
 @mock.patch('dnf.cli.cli.Cli._read_conf_file')
 class CliTest(tests.support.DnfBaseTestCase):
 
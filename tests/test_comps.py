@@ -21,6 +21,8 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import operator
+import os
+import tempfile
 
 import libcomps
 import libdnf.transaction
@@ -34,6 +36,41 @@ import tests.support
 from tests.support import mock
 
 
+ARCH_COMPS = u"""<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE comps PUBLIC "-//Red Hat, Inc.//DTD Comps info//EN" "comps.dtd">
+<comps>
+  <group arch="x86_64">
+    <id>x86</id>
+    <name>X86</name>
+    <description>Only on x86_64.</description>
+    <packagelist>
+      <packagereq type="mandatory">lotus</packagereq>
+      <packagereq type="mandatory" arch="ppc64">pepper</packagereq>
+    </packagelist>
+  </group>
+  <group arch="ppc64">
+    <id>ppc</id>
+    <name>PPC</name>
+    <description>Only on ppc64.</description>
+    <packagelist>
+      <packagereq type="mandatory">pepper</packagereq>
+    </packagelist>
+  </group>
+  <group>
+    <id>empty</id>
+    <name>Empty</name>
+    <description>No packages.</description>
+    <packagelist/>
+  </group>
+  <category>
+    <id>empty-category</id>
+    <name>Empty category</name>
+    <description>No groups.</description>
+    <grouplist/>
+  </category>
+</comps>
+"""
+
 TRANSLATION = u"""Tato skupina zahrnuje nejmenší možnou množinu balíčků. Je vhodná například na instalace malých routerů nebo firewallů."""
 
 
@@ -143,6 +180,76 @@ class CompsTest(tests.support.TestCase):
         env = dnf.util.first(comps.environments_by_pattern('sugar-*'))
         self.assertEqual(env.ui_description, u'Software pro výuku o vyučování.')
 
+    def test_indexed_lookup(self):
+        comps = self.comps
+        self.assertEqual({g.id for g in comps.groups_by_pattern('somerset')}, {'somerset'})
+        self.assertEqual({g.id for g in comps.groups_by_pattern('Solid Ground')}, {'somerset'})
+        self.assertEqual({g.id for g in comps.groups_by_pattern('solid ground')}, {'somerset'})
+        self.assertEmpty(comps.groups_by_pattern('solid ground', case_sensitive=True))
+        self.assertEmpty(comps.groups_by_pattern('no-such-group'))
+        self.assertEqual(comps._group_by_id('somerset').name, 'Solid Ground')
+        self.assertIsNone(comps._group_by_id('Solid Ground'))
+
+    def test_index_reset(self):
+        comps = self.comps
+        self.assertLength(comps.groups_by_pattern('Base'), 1)
+        comps._add_from_xml_filename(tests.support.COMPS_PATH)
+        self.assertEqual(comps._indexes, {})
+
+    @mock.patch('locale.getlocale', return_value=('cs_CZ', 'UTF-8'))
+    def test_indexed_ui_name(self, _unused):
+        group = self.comps.group_by_pattern(u'Kritická cesta (Základ)')
+        self.assertEqual(group.id, 'base')
+
+
+class CompsCacheTest(tests.support.TestCase):
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp(prefix="dnf_test_comps_")
+        self.persistor = dnf.persistor.CompsCachePersistor(self.cachedir)
+
+    def tearDown(self):
+        dnf.util.rm_rf(self.cachedir)
+
+    def test_cache_key(self):
+        key = dnf.comps._cache_key([('main', tests.support.COMPS_PATH)])
+        self.assertEqual(key, dnf.comps._cache_key([('main', tests.support.COMPS_PATH)]))
+        self.assertNotEqual(key, dnf.comps._cache_key([('other', tests.support.COMPS_PATH)]))
+        self.assertIsNone(dnf.comps._cache_key([('main', '/does/not/exist')]))
+
+    def test_save_load(self):
+        comps = dnf.comps.Comps()
+        comps._add_from_xml_filename(tests.support.COMPS_PATH)
+        self.assertIsNone(self.persistor.load('old'))
+        self.assertTrue(self.persistor.save('old', comps))
+        self.assertTrue(self.persistor.save('new', comps))
+        self.assertIsNone(self.persistor.load('old'))
+
+        cached = dnf.comps.Comps()
+        cached._add_from_xml_filename(self.persistor.load('new'))
+        self.assertEqual([g.id for g in cached.groups_iter()],
+                         [g.id for g in comps.groups_iter()])
+        self.assertLength(cached.environments, 1)
+
+    def test_save_load_arch_and_empty(self):
+        fn = os.path.join(self.cachedir, 'arch_comps.xml')
+        with open(fn, 'w') as f:
+            f.write(ARCH_COMPS)
+        comps = dnf.comps.Comps()
+        comps._add_from_xml_filename(fn)
+        self.assertTrue(self.persistor.save('key', comps))
+        cached = dnf.comps.Comps()
+        cached._add_from_xml_filename(self.persistor.load('key'))
+
+        def content(comps):
+            groups = [(g.id, sorted(p.name for p in g.packages_iter())) for g in comps.groups_iter()]
+            return sorted(groups), [c.id for c in comps.categories_iter()]
+
+        self.assertEqual(content(cached), content(comps))
+        comps._i.arch_filter(['x86_64'])
+        cached._i.arch_filter(['x86_64'])
+        self.assertEqual(content(cached), content(comps))
+        self.assertEqual(content(cached), ([('empty', []), ('x86', ['lotus'])], ['empty-category']))
+
 
 class PackageTest(tests.support.TestCase):
     def test_instance(self):
@@ -104,6 +104,20 @@ class ConfTest(tests.support.TestCase):
         self.assertFalse(conf.gpgcheck)
         self.assertEqual(conf.installonly_limit, 5)
 
+    def test_py_option(self):
+        conf = Conf()
+        self.assertEqual(conf.max_parallel_repo_loads, 1)
+        conf.max_parallel_repo_loads = 4
+        self.assertEqual(conf.max_parallel_repo_loads, 4)
+        self.assertEqual(conf._get_priority('max_parallel_repo_loads'), dnf.conf.PRIO_RUNTIME)
+
+        opts = argparse.Namespace(main_setopts={'max_parallel_repo_loads': ['8']})
+        conf._configure_from_options(opts)
+        self.assertEqual(conf.max_parallel_repo_loads, 8)
+
+        opts = argparse.Namespace(main_setopts={'max_parallel_repo_loads': ['many']})
+        self.assertRaises(dnf.exceptions.ConfigError, conf._configure_from_options, opts)
+
     def test_inheritance1(self):
         conf = Conf()
         repo = RepoConf(conf)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, see
+# <https://www.gnu.org/licenses/>.  Any Red Hat trademarks that are
+# incorporated in the source code or documentation are not subject to the GNU
+# General Public License and may only be used or replicated with the express
+# permission of Red Hat, Inc.
+#
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import dnf.drpm
+
+import tests.support
+from tests.support import mock
+
+
+def _pload(name, size):
+    pload = mock.MagicMock(_full_size=size)
+    pload.__str__.return_value = name
+    pload.pkg.verifyLocalPkg.return_value = True
+    return pload
+
+
+class DeltaInfoTest(tests.support.TestCase):
+
+    def setUp(self):
+        self.progress = mock.Mock()
+        self.drpm = dnf.drpm.DeltaInfo(None, self.progress, deltarpm_percentage=75)
+        self.started = []
+
+        def run_job(pload):
+            self.started.append(pload)
+            return 1 if pload.pkg.fail else 0
+
+        self.drpm.run_job = run_job
+
+    @mock.patch('os.unlink')
+    def test_rebuild(self, unlink):
+        good = _pload('good', 10)
+        good.pkg.fail = False
+        bad = _pload('bad', 20)
+        bad.pkg.fail = True
+        self.drpm.enqueue(good)
+        self.drpm.enqueue(bad)
+        self.drpm.wait()
+        self.assertCountEqual(self.started, [good, bad])
+        self.assertEqual(list(self.drpm.err), [bad.pkg])
+        self.progress.end.assert_called_once_with(good, dnf.callback.STATUS_DRPM, 'done')
+        self.assertEqual(self.drpm.workers, [])
+        self.assertEqual(self.drpm.pending, 0)
+
+    @mock.patch('os.unlink')
+    def test_job_exception(self, unlink):
+        def run_job(pload):
+            raise RuntimeError('boom')
+
+        self.drpm.run_job = run_job
+        pload = _pload('broken', 10)
+        with mock.patch('dnf.drpm.logger') as logger:
+            self.drpm.enqueue(pload)
+            self.drpm.wait()
+        logger.error.assert_called_once()
+        self.assertEqual(list(self.drpm.err), [pload.pkg])
+        self.assertEqual(self.drpm.pending, 0)
+
+    def test_biggest_first(self):
+        for pload in (_pload('small', 1), _pload('big', 100), _pload('medium', 10)):
+            pload.pkg.fail = False
+            self.drpm.queue.put((-pload._full_size, next(self.drpm._order), pload))
+        self.drpm.queue.put((float('inf'), next(self.drpm._order), None))
+        # run the worker loop in this thread, it returns at the end marker
+        self.drpm._worker()
+        self.assertEqual([str(pload) for pload in self.started], ['big', 'medium', 'small'])
@@ -19,8 +19,12 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import shutil
+import tempfile
+
 import libdnf.transaction
 
+import dnf.db.history
 import dnf.history
 
 import tests.support
@@ -502,3 +506,63 @@ class TransactionConverterTest(tests.support.TestCase):
             yield (item.op_type, item.installed, item.erased, item.obsoleted,
                    item.reason)
 '''
+
+
+class BulkLookupTest(tests.support.TestCase):
+    """repos() and reasons() must not differ from the libdnf point lookups."""
+
+    def setUp(self):
+        self.db_dir = tempfile.mkdtemp(prefix="dnf-history-test-")
+        self.history = dnf.db.history.SwdbInterface(self.db_dir)
+
+    def tearDown(self):
+        self.history.close()
+        shutil.rmtree(self.db_dir)
+
+    def _transaction(self, items, state=libdnf.transaction.TransactionState_DONE):
+        swdb = self.history.swdb
+        tsis = []
+        for nevra, repoid, action, reason in items:
+            rpm_item = self.history.pkg_to_swdb_rpm_item(tests.support.MockPackage(nevra))
+            tsis.append(swdb.addItem(rpm_item, repoid, action, reason))
+        self.history.beg('', [], [])
+        for tsi in tsis:
+            tsi.setState(libdnf.transaction.TransactionItemState_DONE)
+        self.history.end('', state)
+        swdb.closeTransaction()
+        swdb.initTransaction()
+
+    def test_same_as_libdnf(self):
+        self._transaction([
+            ('pepper-20-0.x86_64', 'main', libdnf.transaction.TransactionItemAction_INSTALL,
+             libdnf.transaction.TransactionItemReason_USER),
+            ('lotus-3-16.x86_64', 'main', libdnf.transaction.TransactionItemAction_INSTALL,
+             libdnf.transaction.TransactionItemReason_DEPENDENCY),
+            ('hole-1-1.x86_64', 'main', libdnf.transaction.TransactionItemAction_INSTALL,
+             libdnf.transaction.TransactionItemReason_WEAK_DEPENDENCY)])
+        self._transaction([
+            ('pepper-20-1.x86_64', 'updates', libdnf.transaction.TransactionItemAction_UPGRADE,
+             libdnf.transaction.TransactionItemReason_USER),
+            ('pepper-20-0.x86_64', '@System', libdnf.transaction.TransactionItemAction_UPGRADED,
+             libdnf.transaction.TransactionItemReason_USER),
+            ('hole-1-1.x86_64', '@System', libdnf.transaction.TransactionItemAction_REMOVE,
+             libdnf.transaction.TransactionItemReason_CLEAN)])
+        self._transaction([
+            ('lotus-3-16.x86_64', 'main', libdnf.transaction.TransactionItemAction_REASON_CHANGE,
+             libdnf.transaction.TransactionItemReason_USER)])
+        # not finished, ignored by the reason resolution
+        self._transaction([
+            ('tour-4.6-1.noarch', 'main', libdnf.transaction.TransactionItemAction_INSTALL,
+             libdnf.transaction.TransactionItemReason_GROUP)],
+            state=libdnf.transaction.TransactionState_ERROR)
+
+        pkgs = [tests.support.MockPackage(nevra) for nevra in (
+            'pepper-20-0.x86_64', 'pepper-20-1.x86_64', 'lotus-3-16.x86_64',
+            'hole-1-1.x86_64', 'tour-4.6-1.noarch', 'mrkite-2-0.x86_64')]
+        expected_repos = {pkg: self.history.swdb.getRPMRepo(str(pkg)) for pkg in pkgs}
+        expected_reasons = {
+            pkg: self.history.swdb.resolveRPMTransactionItemReason(pkg.name, pkg.arch, -1)
+            for pkg in pkgs}
+
+        self.assertEqual(self.history.repos(pkgs), expected_repos)
+        self.assertEqual(self.history.reasons(pkgs), expected_reasons)
@@ -30,6 +30,7 @@ import multiprocessing
 import os
 import re
 import threading
+import time
 
 
 import dnf.lock
@@ -79,8 +80,8 @@ class OtherProcess(ConcurrencyMixin, mp_context.Process):
 TARGET = os.path.join(tests.support.USER_RUNDIR, 'unit-test.pid')
 
 
-def build_lock(blocking=False):
-    return dnf.lock.ProcessLock(TARGET, 'unit-tests', blocking)
+def build_lock(blocking=False, timeout=None):
+    return dnf.lock.ProcessLock(TARGET, 'unit-tests', blocking, timeout)
 
 
 class LockTest(tests.support.TestCase):
@@ -133,6 +134,36 @@ class ProcessLockTest(tests.support.TestCase):
         self.assertEqual(process.queue.empty(), True)
         self.assertPathDoesNotExist(target)
 
+    def test_blocking_wait_metrics(self):
+        l1 = build_lock(blocking=True)
+        l2 = build_lock()
+        queue = mp_context.Queue(1)
+
+        def wait():
+            with l1:
+                queue.put((l1.holder_pid, l1.wait_time))
+
+        process = mp_context.Process(target=wait)
+        with l2:
+            process.start()
+            time.sleep(0.2)
+        holder_pid, wait_time = queue.get(timeout=10)
+        process.join()
+        self.assertEqual(holder_pid, os.getpid())
+        self.assertGreater(wait_time, 0)
+        self.assertPathDoesNotExist(l1.target)
+
+    def test_blocking_timeout(self):
+        l1 = build_lock(blocking=True, timeout=0.1)
+        l2 = build_lock()
+        process = OtherProcess(l1)
+        with l2:
+            process.start()
+            process.join()
+        error = process.queue.get()
+        self.assertIsInstance(error, ProcessLockError)
+        self.assertEqual(error.pid, os.getpid())
+
     def test_another_thread(self):
         l1 = build_lock()
         thread = OtherThread(l1)
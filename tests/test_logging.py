@@ -20,6 +20,7 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 
 import logging
+import logging.handlers
 import collections
 import gzip
 import operator
@@ -159,6 +160,9 @@ class TestLogging(tests.support.TestCase):
         logger = logging.getLogger("dnf.rpm")
         with tests.support.patch_std_streams() as (stdout, stderr):
             logger.info('rpm transaction happens.')
+        # the file handler buffers records below WARNING
+        for handler in logger.handlers:
+            handler.flush()
         # rpm logger never outputs to the console:
         self.assertEqual(stdout.getvalue(), "")
         self.assertEqual(stderr.getvalue(), "")
@@ -207,3 +211,75 @@ class TestLogging(tests.support.TestCase):
             msgs = map(operator.attrgetter("message"),
                        map(_split_logfile_entry, f.readlines()))
         self.assertSequenceEqual(list(msgs), ['i'])
+
+
+class MultiprocessRotatingFileHandlerTest(tests.support.TestCase):
+    def setUp(self):
+        self.logdir = tempfile.mkdtemp(prefix="dnf-logtest-")
+        self.logfile = os.path.join(self.logdir, "dnf.log")
+        self.handlers = []
+
+    def tearDown(self):
+        for handler in self.handlers:
+            handler.close()
+        dnf.util.rm_rf(self.logdir)
+
+    def _handler(self, max_bytes=0, backup_count=0, cls=dnf.logging.MultiprocessRotatingFileHandler):
+        handler = cls(self.logfile, maxBytes=max_bytes, backupCount=backup_count)
+        self.handlers.append(handler)
+        return handler
+
+    @staticmethod
+    def _record(msg, level=logging.DEBUG):
+        return logging.makeLogRecord({'msg': msg, 'levelno': level,
+                                      'levelname': logging.getLevelName(level)})
+
+    def _read(self, path=None):
+        with open(path or self.logfile) as f:
+            return f.read().splitlines()
+
+    def test_batches(self):
+        handler = self._handler()
+        handler.handle(self._record('d1'))
+        handler.handle(self._record('d2'))
+        self.assertEqual(self._read(), [])
+        handler.handle(self._record('w', logging.WARNING))
+        self.assertEqual(self._read(), ['d1', 'd2', 'w'])
+
+        for i in range(handler.capacity):
+            handler.handle(self._record(str(i)))
+        self.assertLength(self._read(), 3 + handler.capacity)
+
+        handler.handle(self._record('d3'))
+        handler.close()
+        self.assertEqual(self._read()[-1], 'd3')
+
+    def test_rotation_in_batch(self):
+        handler = self._handler(max_bytes=7, backup_count=3)
+        for msg in ('aa', 'bb', 'cc'):
+            handler.handle(self._record(msg))
+        handler.flush()
+        self.assertEqual(self._read(), ['cc'])
+        self.assertEqual(self._read(self.logfile + '.1'), ['aa', 'bb'])
+
+    def test_rotated_by_other_process(self):
+        first = self._handler(max_bytes=7, backup_count=3)
+        second = self._handler(max_bytes=7, backup_count=3)
+        first.handle(self._record('aa', logging.WARNING))
+        first.handle(self._record('bb', logging.WARNING))
+        second.handle(self._record('cc', logging.WARNING))
+        self.assertEqual(self._read(self.logfile + '.1'), ['aa', 'bb'])
+        # the first handler continues in the new file instead of rotating it again
+        first.handle(self._record('dd', logging.WARNING))
+        self.assertEqual(self._read(), ['cc', 'dd'])
+        self.assertFalse(os.path.exists(self.logfile + '.2'))
+
+    def test_flush_timer(self):
+        handler = self._handler()
+        handler.flush_interval = 0.2
+        handler.handle(self._record('d1'))
+        timer = handler._timer
+        self.assertEqual(self._read(), [])
+        timer.join(5)
+        self.assertEqual(self._read(), ['d1'])
+        self.assertIsNone(handler._timer)
@@ -47,3 +47,23 @@ class RepoPersistorTest(tests.support.TestCase):
 
         persistor = dnf.persistor.RepoPersistor(self.persistdir)
         self.assertEqual(persistor.get_expired_repos(), IDS)
+
+
+class SackSnapshotPersistorTest(tests.support.TestCase):
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp(prefix="dnf-persistor-test-")
+        self.persistor = dnf.persistor.SackSnapshotPersistor(self.cachedir)
+
+    def tearDown(self):
+        dnf.util.rm_rf(self.cachedir)
+
+    def test_snapshot(self):
+        snapshot = {'excludes': {'main': ['pepper-0:20-0.x86_64']},
+                    'includes': [[None, {'main': ['librita-0:1-1.x86_64']}]]}
+        self.assertIsNone(self.persistor.load('abc'))
+        self.assertTrue(self.persistor.save('abc', snapshot))
+
+        persistor = dnf.persistor.SackSnapshotPersistor(self.cachedir)
+        self.assertEqual(persistor.load('abc'), snapshot)
+        # a different key invalidates the snapshot
+        self.assertIsNone(persistor.load('def'))
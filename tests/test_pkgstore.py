@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, see
+# <https://www.gnu.org/licenses/>.  Any Red Hat trademarks that are
+# incorporated in the source code or documentation are not subject to the GNU
+# General Public License and may only be used or replicated with the express
+# permission of Red Hat, Inc.
+#
+
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+
+import dnf.pkgstore
+
+import tests.support
+from tests.support import mock
+
+
+class PackageStoreTest(tests.support.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="dnf_test_pkgstore_")
+        self.store = dnf.pkgstore.PackageStore(os.path.join(self.tmpdir, 'store'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _pkg(self, name, csum, content=b'rpm', repo='repo'):
+        pkg = mock.Mock()
+        pkg.returnIdSum.return_value = ('sha256', csum)
+        pkg.localPkg.return_value = os.path.join(self.tmpdir, repo, 'packages', name + '.rpm')
+        pkg.downloadsize = len(content)
+        pkg.verifyLocalPkg.return_value = True
+        pkg.content = content
+        return pkg
+
+    @staticmethod
+    def _download(pkg):
+        os.makedirs(os.path.dirname(pkg.localPkg()))
+        with open(pkg.localPkg(), 'wb') as f:
+            f.write(pkg.content)
+
+    def test_add_fetch(self):
+        pkg = self._pkg('pepper', 'abcd')
+        self.assertFalse(self.store.fetch(pkg))
+        self._download(pkg)
+        self.assertTrue(self.store.add(pkg))
+        self.assertFalse(self.store.add(pkg))
+
+        # the same package in another repository
+        other = self._pkg('pepper', 'abcd', repo='other')
+        self.assertTrue(self.store.fetch(other))
+        with open(other.localPkg(), 'rb') as f:
+            self.assertEqual(f.read(), b'rpm')
+        # already there
+        self.assertFalse(self.store.fetch(other))
+
+    def test_add_reuses_download_verification(self):
+        pkg = self._pkg('pepper', 'abcd')
+        self._download(pkg)
+        self.assertTrue(self.store.add(pkg))
+        pkg.verifyLocalPkg.assert_not_called()
+
+    def test_incomplete(self):
+        pkg = self._pkg('pepper', 'abcd')
+        self.assertFalse(self.store.add(pkg))
+        self._download(pkg)
+        pkg.downloadsize += 1
+        self.assertFalse(self.store.add(pkg))
+        self.assertFalse(self.store.fetch(self._pkg('pepper', 'abcd', repo='other')))
+
+    def test_not_linked(self):
+        pkg = self._pkg('pepper', 'abcd')
+        self._download(pkg)
+        self.store.add(pkg)
+        # rewriting the cached file in place keeps the stored copy
+        with open(pkg.localPkg(), 'r+b') as f:
+            f.write(b'RPM')
+        with open(self.store._path(pkg), 'rb') as f:
+            self.assertEqual(f.read(), b'rpm')
+
+    def test_size_mismatch(self):
+        pkg = self._pkg('pepper', 'abcd')
+        self._download(pkg)
+        self.store.add(pkg)
+        other = self._pkg('pepper', 'abcd', content=b'other rpm', repo='other')
+        self.assertFalse(self.store.fetch(other))
+
+    def test_evict_lru(self):
+        self.store.max_size = 6
+        pkgs = [self._pkg(name, csum, repo=name)
+                for name, csum in (('pepper', 'aa01'), ('tour', 'bb02'), ('lotus', 'cc03'))]
+        for mtime, pkg in enumerate(pkgs):
+            self._download(pkg)
+            self.store.add(pkg)
+            os.utime(self.store._path(pkg), (mtime, mtime))
+        self.store.evict()
+        stored = [os.path.exists(self.store._path(pkg)) for pkg in pkgs]
+        self.assertEqual(stored, [False, True, True])
+
+    def test_evict_walks_only_over_limit(self):
+        self.store.max_size = 6
+        pepper = self._pkg('pepper', 'aa01', repo='pepper')
+        self._download(pepper)
+        self.store.add(pepper)
+        self.store.evict()
+        self.assertEqual(self.store._recorded_size(), 3)
+
+        tour = self._pkg('tour', 'bb02', repo='tour')
+        self._download(tour)
+        self.store.add(tour)
+        with mock.patch('os.walk') as walk:
+            self.store.evict()
+        walk.assert_not_called()
+        self.assertEqual(self.store._recorded_size(), 6)
+        # nothing added
+        with mock.patch('os.walk') as walk:
+            self.store.evict()
+        walk.assert_not_called()
+
+        lotus = self._pkg('lotus', 'cc03', repo='lotus')
+        self._download(lotus)
+        self.store.add(lotus)
+        self.store.evict()
+        self.assertEqual(self.store._recorded_size(), 6)
@@ -19,11 +19,16 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import os
+import shutil
+import tempfile
+
 import dnf.logging
 import dnf.plugin
 import dnf.pycomp
 
 import tests.support
+from tests.support import mock
 
 
 PLUGINS = "%s/tests/plugins" % tests.support.dnf_toplevel()
@@ -105,3 +110,127 @@ class PluginNonExistentTest(tests.support.TestCase):
         end = ('Error: No module named \'testpkg\'\n' if dnf.pycomp.PY3
                else 'Error: No module named testpkg.nonexistent\n')
         self.assertTracebackIn(end, stream.getvalue())
+
+
+DECLARED_PLUGIN = """\
+import dnf
+
+
+class DeferredPlugin(dnf.Plugin):
+
+    name = 'deferred'
+    hooks = ('sack',)
+    commands = ('deferred-cmd',)
+
+    def sack(self):
+        pass
+"""
+
+UNDECLARED_PLUGIN = """\
+import dnf
+
+
+class EagerPlugin(dnf.Plugin):
+
+    name = 'eager'
+"""
+
+
+class PluginManifestTest(tests.support.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="dnf_test_plugin_")
+        self.plugindir = os.path.join(self.tmpdir, 'plugins')
+        os.mkdir(self.plugindir)
+        for fn, content in (('deferred.py', DECLARED_PLUGIN), ('eager.py', UNDECLARED_PLUGIN)):
+            with open(os.path.join(self.plugindir, fn), 'w') as f:
+                f.write(content)
+        self.conf = tests.support.FakeConf(cachedir=self.tmpdir, pluginpath=[self.plugindir],
+                                           pluginconfpath=[self.plugindir])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_scan(self):
+        manifest = dnf.plugin._plugins_manifest(self.conf)
+        files = dict((fn, declared) for fn, _, declared in manifest[self.plugindir]['files'])
+        self.assertEqual(files[os.path.join(self.plugindir, 'deferred.py')], [{
+            'name': 'deferred', 'config_name': None,
+            'hooks': ['sack'], 'commands': ['deferred-cmd']}])
+        self.assertIsNone(files[os.path.join(self.plugindir, 'eager.py')])
+
+    def test_cached(self):
+        manifest = dnf.plugin._plugins_manifest(self.conf)
+        with mock.patch('dnf.plugin._scan_plugin_file') as scan, \
+                mock.patch('dnf.plugin.glob.glob') as glob:
+            self.assertEqual(dnf.plugin._plugins_manifest(self.conf), manifest)
+        scan.assert_not_called()
+        glob.assert_not_called()
+
+    def test_rescan_changed_file(self):
+        dnf.plugin._plugins_manifest(self.conf)
+        path = os.path.join(self.plugindir, 'eager.py')
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+        with mock.patch('dnf.plugin._scan_plugin_file', return_value=None) as scan:
+            dnf.plugin._plugins_manifest(self.conf)
+        scan.assert_called_once_with(path)
+
+
+class DeferredPluginTest(tests.support.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="dnf_test_plugin_")
+        with open(os.path.join(self.tmpdir, 'deferred.py'), 'w') as f:
+            f.write(DECLARED_PLUGIN)
+        self.conf = tests.support.FakeConf(cachedir=self.tmpdir, pluginpath=[self.tmpdir],
+                                           pluginconfpath=[self.tmpdir])
+        self.plugins = dnf.plugin.Plugins()
+
+        self.plugin_cls = mock.Mock()
+        self.plugin_cls.name = 'deferred'
+        self.plugin_cls.return_value.name = 'deferred'
+        patcher = mock.patch('dnf.plugin._import_modules')
+        self.import_modules = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('dnf.plugin._plugin_classes', side_effect=self._classes)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _imported(self):
+        return [fn for call in self.import_modules.call_args_list for fn in call[0][1]]
+
+    def _classes(self):
+        return [self.plugin_cls] if self._imported() else []
+
+    def tearDown(self):
+        # drop the instance now, its __del__ unloads the plugin package
+        self.plugins = None
+        shutil.rmtree(self.tmpdir)
+
+    def test_imported_on_hook(self):
+        self.plugins._load(self.conf, (), ('deferred',))
+        self.plugins._run_init(None, None)
+        self.assertLength(self.plugins.plugins, 0)
+        self.plugins._run_config()
+        self.assertEqual(self._imported(), [])
+
+        self.plugins.run_sack()
+        self.assertEqual(self._imported(), [os.path.join(self.tmpdir, 'deferred.py')])
+        self.assertLength(self.plugins.plugins, 1)
+        self.plugin_cls.assert_called_once_with(None, None)
+        self.plugin_cls.return_value.sack.assert_called_once_with()
+        self.assertIn(('deferred', 'sack'), self.plugins.hook_times)
+
+    def test_deferred_for_other_command(self):
+        cli = mock.Mock(cli_commands={'install': None}, _requested_command='install')
+        self.plugins._load(self.conf, (), ('deferred',))
+        self.plugins._run_init(None, cli)
+        self.assertEqual(self._imported(), [])
+
+    def test_imported_for_command(self):
+        cli = mock.Mock(cli_commands={'install': None}, _requested_command='deferred-cmd')
+        self.plugins._load(self.conf, (), ('deferred',))
+        self.plugins._run_init(None, cli)
+        self.assertLength(self.plugins.plugins, 1)
+        self.plugin_cls.assert_called_once_with(None, cli)
@@ -133,3 +133,31 @@ class DictsTest(tests.support.TestCase):
                 test_list.append(item)
 
         self.assertCountEqual(test_list, pkgs)
+
+
+class NevraPatternsTest(tests.support.TestCase):
+
+    def setUp(self):
+        self.sack = tests.support.mock_sack('main', 'updates')
+
+    def _best_query(self, patterns):
+        query = self.sack.query().filterm(empty=True)
+        for pattern in patterns:
+            subj = dnf.subject.Subject(pattern)
+            query = query.union(subj.get_best_query(
+                self.sack, with_nevra=True, with_provides=False, with_filenames=False))
+        return query
+
+    def test_compile(self):
+        names, globs, others = dnf.query._compile_nevra_patterns(
+            ('lotus', 'mrkite*', 'pepper-20', 'tour-4.6-1.noarch', '*.i686'))
+        self.assertEqual(names, ('lotus', 'pepper-20'))
+        self.assertEqual(globs, ('mrkite*',))
+        self.assertEqual(others, ('tour-4.6-1.noarch', '*.i686'))
+
+    def test_same_as_subject(self):
+        patterns = ['lotus', 'mrkite*', 'mrkite-k-h', 'pepper-20', 'tour-4.6-1.noarch',
+                    '*.i686', 'trampoline-2*', 'nosuchpackage', 'hole-1*']
+        expected = self._best_query(patterns)
+        query = dnf.query._by_nevra_patterns(self.sack, patterns)
+        self.assertCountEqual(query.run(), expected.run())
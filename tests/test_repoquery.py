@@ -168,3 +168,108 @@ class Rpm2PyFormatTest(tests.support.TestCase):
         fmt = dnf.cli.commands.repoquery.rpm2py_format(
             '%{name}-%{repoid} :: %-40{arch}')
         self.assertEqual(fmt, '{0.name}-{0.repoid} :: {0.arch:>40}')
+
+
+class DeplistTest(tests.support.TestCase):
+    def test_deplist_resolves_each_requirement_once(self):
+        tour = mock.MagicMock(requires=['libc.so.6', 'lotus'])
+        tour.__str__.return_value = 'tour-5-0.noarch'
+        trampoline = mock.MagicMock(requires=['libc.so.6'])
+        trampoline.__str__.return_value = 'trampoline-2.1-1.noarch'
+        tour.__lt__ = lambda self, other: False
+        trampoline.__lt__ = lambda self, other: True
+        query = mock.Mock()
+        query.run.return_value = [tour, trampoline]
+
+        cmd = dnf.cli.commands.repoquery.RepoQueryCommand(mock.Mock())
+        cmd.opts = mock.Mock(verbose=True)
+        cmd.filter_repo_arch = lambda opts, query: query
+        with mock.patch('dnf.subject.Subject') as subject, \
+                tests.support.patch_std_streams() as (stdout, _):
+            providers = subject.return_value.get_best_query.return_value.available.return_value
+            providers.run.return_value = ['glibc-2.38-1.x86_64']
+            cmd._deplist_report(query)
+
+        self.assertEqual(subject.call_count, 2)
+        self.assertEqual(stdout.getvalue(),
+                         'package: trampoline-2.1-1.noarch\n'
+                         '  dependency: libc.so.6\n'
+                         '   provider: glibc-2.38-1.x86_64\n'
+                         '\n'
+                         'package: tour-5-0.noarch\n'
+                         '  dependency: libc.so.6\n'
+                         '   provider: glibc-2.38-1.x86_64\n'
+                         '  dependency: lotus\n'
+                         '   provider: glibc-2.38-1.x86_64\n')
+
+
+class StreamTest(tests.support.TestCase):
+    def test_queryformat_tags(self):
+        self.assertEqual(
+            dnf.cli.commands.repoquery.queryformat_tags('%{NAME} %{name}-%40{arch} %{base} %{requires}'),
+            ['name', 'arch', 'requires'])
+
+    def test_stream_conflicts(self):
+        for option in ('--stream', '--ndjson'):
+            for args in (['--requires'], ['--provides'], ['--requires', '--resolve'], ['--resolve'],
+                         ['--location'], ['--deplist'], ['--groupmember'],
+                         ['--tree', '--requires']):
+                cmd = dnf.cli.commands.repoquery.RepoQueryCommand(mock.Mock())
+                cmd.cli._option_conflict.side_effect = dnf.exceptions.Error
+                with self.assertRaises(dnf.exceptions.Error):
+                    tests.support.command_configure(cmd, [option] + args)
+                cmd.cli._option_conflict.assert_called_once_with(option, mock.ANY)
+
+    def test_ndjson(self):
+        pkg = mock.Mock(version='1.0.1', epoch=0, requires=['b', 'a', 'b'], sourcerpm=None)
+        pkg.name = 'foobar'
+        cmd = dnf.cli.commands.repoquery.RepoQueryCommand(mock.Mock())
+        cmd.opts = mock.Mock(ndjson=True,
+                             queryformat='%{name} %{epoch}:%{version} %{requires} %{sourcerpm}')
+        with tests.support.patch_std_streams() as (stdout, _):
+            cmd._stream_report([pkg, pkg])
+        line = '{"name": "foobar", "epoch": 0, "version": "1.0.1", "requires": ["a", "b"], ' \
+               '"sourcerpm": null}\n'
+        self.assertEqual(stdout.getvalue(), line * 2)
+
+
+class TreeTest(tests.support.TestCase):
+    def setUp(self):
+        self.pkgs = {}
+        for name in ('glibc', 'bash', 'tour', 'lotus'):
+            pkg = mock.Mock(requires=[])
+            pkg.name = name
+            self.pkgs[name] = pkg
+        # reverse dependencies: bash and tour require glibc, lotus requires bash
+        self.dependents = {'glibc': ['tour', 'bash'], 'bash': ['lotus'], 'tour': [], 'lotus': []}
+        self.aquery = mock.Mock()
+        self.aquery.filter.side_effect = lambda requires__glob: mock.Mock(
+            run=mock.Mock(return_value=[self.pkgs[n] for n in self.dependents[requires__glob]]))
+        self.cmd = dnf.cli.commands.repoquery.RepoQueryCommand(mock.Mock())
+        self.shown = []
+        self.cmd.grow_tree = lambda level, pkg, opts: self.shown.append((level, pkg.name))
+
+    def _tree(self, **kwargs):
+        opts = mock.Mock(packageatr=None, alldeps=False, tree_max_depth=None, tree_max_nodes=None)
+        for key, value in kwargs.items():
+            setattr(opts, key, value)
+        query = mock.Mock(run=mock.Mock(return_value=[self.pkgs['glibc']]))
+        self.cmd.tree_seed(query, self.aquery, opts)
+
+    def test_tree(self):
+        self._tree()
+        self.assertEqual(self.shown, [(-1, 'glibc'), (0, 'bash'), (1, 'lotus'), (0, 'tour')])
+        self.assertEqual(self.aquery.filter.call_count, 4)
+
+    def test_tree_limits(self):
+        self._tree(tree_max_depth=1)
+        self.assertEqual(self.shown, [(-1, 'glibc'), (0, 'bash'), (0, 'tour')])
+        del self.shown[:]
+        self._tree(tree_max_nodes=2)
+        self.assertEqual(self.shown, [(-1, 'glibc'), (0, 'bash')])
+
+    def test_tree_limits_validation(self):
+        for args in (['--tree-max-nodes=0'], ['--tree-max-nodes=-1'], ['--tree-max-depth=-1']):
+            cmd = dnf.cli.commands.repoquery.RepoQueryCommand(mock.Mock())
+            with self.assertRaises(dnf.cli.CliError):
+                tests.support.command_configure(cmd, ['--tree', '--requires'] + args)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, see
+# <https://www.gnu.org/licenses/>.  Any Red Hat trademarks that are
+# incorporated in the source code or documentation are not subject to the GNU
+# General Public License and may only be used or replicated with the express
+# permission of Red Hat, Inc.
+#
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import dnf.exceptions
+import dnf.rpm
+
+import tests.support
+from tests.support import mock
+
+
+class HeaderLoaderTest(tests.support.TestCase):
+    def setUp(self):
+        self.loader = dnf.rpm._HeaderLoader(jobs=2)
+
+    def tearDown(self):
+        self.loader.close()
+
+    def test_header(self):
+        pkg = mock.Mock(_header=None)
+        pkg.localPkg.return_value = tests.support.TOUR_44_PKG_PATH
+        self.loader.prefetch([tests.support.TOUR_44_PKG_PATH])
+        self.assertEqual(self.loader.header(pkg)['name'], 'tour')
+        self.assertEqual(self.loader._pending, {})
+        # not prefetched
+        self.assertIsNone(self.loader.header(pkg))
+
+    @mock.patch('dnf.rpm.transaction.initReadOnlyTransaction', side_effect=mock.Mock)
+    @mock.patch('dnf.rpm._header', side_effect=lambda path, ts: (path, ts))
+    def test_reused_ts(self, _header, init_ts):
+        pkgs = [mock.Mock(**{'localPkg.return_value': path})
+                for path in ('a.rpm', 'b.rpm', 'c.rpm', 'd.rpm')]
+        self.loader.prefetch([pkg.localPkg() for pkg in pkgs])
+        self.assertEqual([self.loader.header(pkg)[0] for pkg in pkgs],
+                         ['a.rpm', 'b.rpm', 'c.rpm', 'd.rpm'])
+        # one transaction set per reading thread
+        self.assertLessEqual(init_ts.call_count, 2)
+        self.assertEqual(len({args[1] for args, _kwargs in _header.call_args_list}), init_ts.call_count)
+
+    @mock.patch('dnf.rpm.transaction.initReadOnlyTransaction')
+    @mock.patch('dnf.rpm._header', side_effect=dnf.exceptions.Error('broken'))
+    def test_prefetch_error(self, _header, _init_ts):
+        pkg = mock.Mock(**{'localPkg.return_value': 'a.rpm'})
+        self.loader.prefetch(['a.rpm'])
+        self.assertRaises(dnf.exceptions.Error, self.loader.header, pkg)
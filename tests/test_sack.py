@@ -19,6 +19,8 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import json
+
 import dnf.exceptions
 import dnf.repo
 import dnf.sack
@@ -66,6 +68,30 @@ class SackTest(tests.support.DnfBaseTestCase):
         self.assertLength(peppers, 1)
         self.assertEqual(str(peppers[0]), "librita-1-1.x86_64")
 
+    def test_snapshot_round_trip(self):
+        def setup_base():
+            base = tests.support.MockBase('main', 'updates')
+            base.conf.excludepkgs = ['*.i?86']
+            base.conf.includepkgs = ['lib*', 'pepper']
+            base.repos['main'].excludepkgs = ['pepp*']
+            base.repos['updates'].includepkgs = ['hole']
+            return base
+
+        base = setup_base()
+        excludes, includes = base._evaluate_excludes_includes()
+        snapshot = json.loads(json.dumps(dnf.sack._excludes_snapshot(excludes, includes)))
+        base._apply_excludes_includes(excludes, includes)
+        expected = sorted(map(str, base.sack.query()))
+        self.assertIn('librita-1-1.x86_64', expected)
+
+        restored = setup_base()
+        restored._apply_excludes_includes(*dnf.sack._snapshot_queries(restored.sack, snapshot))
+        self.assertEqual(sorted(map(str, restored.sack.query())), expected)
+
+        fresh = setup_base()
+        fresh._setup_excludes_includes()
+        self.assertEqual(sorted(map(str, fresh.sack.query())), expected)
+
     @mock.patch('dnf.sack._build_sack', lambda x: mock.Mock())
     @mock.patch('dnf.goal.Goal', lambda x: mock.Mock())
     def test_fill_sack(self):
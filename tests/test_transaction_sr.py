@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, see
+# <https://www.gnu.org/licenses/>.  Any Red Hat trademarks that are
+# incorporated in the source code or documentation are not subject to the GNU
+# General Public License and may only be used or replicated with the express
+# permission of Red Hat, Inc.
+#
+
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import time
+
+import hawkey
+
+import dnf.transaction_sr
+
+import tests.support
+
+
+def _old_resolve_pkg(sack, nevra, repo_id):
+    """Per package resolution as done before the NEVRAs were indexed."""
+    parsed_nevra = hawkey.Subject(nevra).get_nevra_possibilities(forms=[hawkey.FORM_NEVRA])[0]
+    epoch = parsed_nevra.epoch if parsed_nevra.epoch is not None else 0
+    query = sack.query().filter(name=parsed_nevra.name, arch=parsed_nevra.arch,
+                                epoch=epoch, version=parsed_nevra.version, release=parsed_nevra.release)
+    if repo_id:
+        query_repo = query.filter(reponame=repo_id)
+        if query_repo:
+            query = query_repo.union(query.installed())
+    return set(query)
+
+
+class ReplayResolveTest(tests.support.DnfBaseTestCase):
+
+    REPOS = ["main", "updates"]
+
+    def _synthetic_rpms(self, copies):
+        rpms = []
+        for pkg in self.base.sack.query():
+            nevra = "%s-%d:%s-%s.%s" % (pkg.name, pkg.epoch, pkg.version, pkg.release, pkg.arch)
+            for repo_id in (pkg.reponame, "main", None):
+                rpms.append({"action": "Install", "nevra": nevra, "reason": "user",
+                             "repo_id": repo_id})
+        rpms.append({"action": "Install", "nevra": "missing-0:1-1.noarch", "reason": "user",
+                     "repo_id": None})
+        return rpms * copies
+
+    def _replay(self, rpms):
+        return dnf.transaction_sr.TransactionReplay(
+            self.base, data={"version": dnf.transaction_sr.VERSION, "rpms": rpms})
+
+    def test_resolve_matches_per_package_queries(self):
+        rpms = self._synthetic_rpms(1)
+        replay = self._replay(rpms)
+        replay._index_rpms()
+        for pkg_data in rpms:
+            parsed_nevra = replay._parse_nevra(pkg_data["nevra"])
+            pkgs = replay._resolve_pkg(parsed_nevra, pkg_data["repo_id"])
+            self.assertEqual(set(pkgs),
+                             _old_resolve_pkg(self.base.sack, pkg_data["nevra"], pkg_data["repo_id"]))
+            installed_na = self.base.sack.query().installed().filter(
+                name=parsed_nevra.name, arch=parsed_nevra.arch)
+            self.assertEqual(
+                set(replay._installed_na_pkgs.get((parsed_nevra.name, parsed_nevra.arch), [])),
+                set(installed_na))
+
+    def test_resolve_benchmark(self):
+        rpms = self._synthetic_rpms(20)
+
+        start = time.time()
+        for pkg_data in rpms:
+            _old_resolve_pkg(self.base.sack, pkg_data["nevra"], pkg_data["repo_id"])
+        old_time = time.time() - start
+
+        start = time.time()
+        replay = self._replay(rpms)
+        replay._index_rpms()
+        for pkg_data in rpms:
+            replay._resolve_pkg(replay._parse_nevra(pkg_data["nevra"]), pkg_data["repo_id"])
+        new_time = time.time() - start
+
+        # timings are too noisy on loaded builders to be always checked
+        if os.environ.get("DNF_BENCHMARK"):
+            print("\nreplay resolution of %d rpms: per package %.3fs, indexed %.3fs"
+                  % (len(rpms), old_time, new_time))
+            self.assertLess(new_time, old_time)
@@ -22,6 +22,8 @@ from __future__ import unicode_literals
 import operator
 import os
 
+import libdnf.transaction
+
 import dnf.util
 
 import tests.support
@@ -248,3 +250,44 @@ class TestMultiCall(tests.support.TestCase):
         l = dnf.util.MultiCallList([o1, o2])
         l.x = 5
         self.assertEqual([5, 5], list(map(operator.attrgetter('x'), [o1, o2])))
+
+
+class TestSyncRpmTransWithSwdb(tests.support.TestCase):
+    class Item(object):
+        def __init__(self, nevra, action):
+            self.nevra = nevra
+            self.action = action
+            self.state = libdnf.transaction.TransactionItemState_UNKNOWN
+            self.pkg = None
+            self.from_repo = 'main'
+            self.reason = libdnf.transaction.TransactionItemReason_USER
+
+        def get_reason(self):
+            return self.reason
+
+        def __str__(self):
+            return self.nevra
+
+    @staticmethod
+    def _element(name, version, release, arch, key=None, failed=False):
+        return mock.Mock(**{'N.return_value': name, 'E.return_value': None,
+                            'V.return_value': version, 'R.return_value': release,
+                            'A.return_value': arch, 'Key.return_value': key,
+                            'Failed.return_value': failed})
+
+    def test_sync(self):
+        new = self.Item('pepper-20-1.x86_64', libdnf.transaction.TransactionItemAction_UPGRADE)
+        old = self.Item('pepper-19-1.x86_64', libdnf.transaction.TransactionItemAction_UPGRADED)
+        gone = self.Item('tour-5-0.noarch', libdnf.transaction.TransactionItemAction_REMOVE)
+        kept = self.Item('tour-5-0.noarch', libdnf.transaction.TransactionItemAction_INSTALL)
+        elements = [self._element('pepper', '20', '1', 'x86_64', key=new),
+                    self._element('pepper', '19', '1', 'x86_64'),
+                    self._element('tour', '5', '0', 'noarch', failed=True)]
+        with mock.patch('dnf.util.logger') as logger:
+            dnf.util._sync_rpm_trans_with_swdb(elements, [new, old, gone, kept])
+        self.assertEqual(new.state, libdnf.transaction.TransactionItemState_DONE)
+        self.assertEqual(old.state, libdnf.transaction.TransactionItemState_DONE)
+        self.assertEqual(gone.state, libdnf.transaction.TransactionItemState_ERROR)
+        # only items to be reverted are matched by NEVRA
+        self.assertEqual(kept.state, libdnf.transaction.TransactionItemState_UNKNOWN)
+        logger.critical.assert_called_once()